@@ -23,17 +23,30 @@ namespace WasteWatchAIBackend.Controllers
             _authService = authService;
         }
 
+        // Optioneel ?since=<timestamp>: alleen items vanaf dat moment (incrementele ingestie door de AI service)
         [HttpGet("trash")]
-        public async Task<ActionResult<IEnumerable<TrashItem>>> GetTrashItems()
+        public async Task<ActionResult<IEnumerable<TrashItem>>> GetTrashItems([FromQuery] DateTime? since = null)
         {
-            var trashItems = await _context.TrashItems.ToListAsync();
+            var query = _context.TrashItems.AsNoTracking();
+            if (since.HasValue)
+            {
+                query = query.Where(t => t.Timestamp >= since.Value);
+            }
+
+            var trashItems = await query.OrderBy(t => t.Timestamp).ToListAsync();
             return Ok(trashItems);
         }
 
         [HttpGet("dummy")]
-        public async Task<ActionResult<IEnumerable<DummyTrashItem>>> GetDummyTrashItems()
+        public async Task<ActionResult<IEnumerable<DummyTrashItem>>> GetDummyTrashItems([FromQuery] DateTime? since = null)
         {
-            var dummyTrashItems = await _context.DummyTrashItems.ToListAsync();
+            var query = _context.DummyTrashItems.AsNoTracking();
+            if (since.HasValue)
+            {
+                query = query.Where(t => t.Timestamp >= since.Value);
+            }
+
+            var dummyTrashItems = await query.OrderBy(t => t.Timestamp).ToListAsync();
             return Ok(dummyTrashItems);
         }
         
@@ -0,0 +1,126 @@
+import asyncio
+
+import Config
+import HttpClient
+from TrashStream import stream_trash_items
+
+BASE_URL = Config.BACKEND_BASE_URL
+
+
+def read_password():
+    try:
+        with open('password.txt', 'r') as file:
+            content = file.read().strip()
+            # Parse the password=value format
+            if '=' in content:
+                return content.split('=')[1]
+            return content
+    except FileNotFoundError:
+        print("⚠️  password.txt file not found")
+        return None
+    except Exception as e:
+        print(f"⚠️  Error reading password file: {e}")
+        return None
+
+
+async def login(base_url: str = BASE_URL):
+    """Login with the service account and return the JWT token"""
+    client = HttpClient.get_client()
+    login_url = f"{base_url}/account/login"
+
+    login_credentials = {
+        "email": "serviceaccount@example.com",
+        "password": read_password()
+    }
+
+    print(f"   🔐 Attempting login at {login_url}")
+    login_response = await client.post(login_url, json=login_credentials, timeout=15)
+    print(f"   🔐 Login response: {login_response.status_code} - {login_response.text}")
+    if login_response.status_code != 200:
+        print(f"   ❌ Login failed with status {login_response.status_code}: {login_response.text}")
+        raise Exception("Login failed")
+
+    jwt_token = login_response.json().get("accessToken")
+    if not jwt_token:
+        print(f"   ❌ No token received from login")
+        raise Exception("Token not received")
+    print(f"   🔑 JWT token received: {jwt_token[:10]}... (truncated for security)")
+    return jwt_token
+
+
+async def fetch_training_data(trash_endpoint: str, label: str,
+                              max_retries: int = Config.BACKEND_MAX_RETRIES,
+                              retry_delay: float = Config.BACKEND_RETRY_DELAY_SECONDS,
+                              since: str = None):
+    """Download trash items (required) and weather records (optional) from the backend with retry logic.
+
+    With `since` only trash items with a timestamp at or after it are requested.
+    Returns (trash_data, weather_data); trash_data is a typed DataFrame (see TrashStream) and
+    None when the backend never became ready.
+    """
+    client = HttpClient.get_client()
+    base_url = BASE_URL
+    trash_data = None
+    weather_data = None
+    jwt_token = None
+
+    print(f"⏳ Waiting for API container to start at {base_url} ({label})")
+    print(f"🔄 Will retry {max_retries} times with {retry_delay}s intervals (max {max_retries * retry_delay / 60:.1f} minutes)")
+
+    # Keep trying until the API container is ready
+    for attempt in range(1, max_retries + 1):
+        try:
+            print(f"🎲 API check {attempt}/{max_retries} ({attempt * retry_delay}s elapsed)")
+
+            # 1. Login to get JWT token
+            jwt_token = await login(base_url)
+            headers = {
+                "Authorization": f"Bearer {jwt_token}"
+            }
+
+            # 2. Call trash API with Authorization header
+            trash_url = f"{base_url}/api/TrashItems/{trash_endpoint}"
+            params = {"since": since} if since else None
+            print(f"   📡 Testing API: {trash_url} with JWT" + (f" (since {since})" if since else ""))
+
+            # Parse the (large) trash payload incrementally into typed columns
+            status_code, body, items = await stream_trash_items(client, trash_url, headers=headers, params=params, timeout=15)
+            if status_code == 200:
+                trash_data = items
+                print(f"🎉 SUCCESS! API container is ready!")
+                print(f"✅ Loaded {len(trash_data)} trash records ({label})")
+                break
+            else:
+                print(f"   ⚠️ API returned {status_code}: {body}")
+
+        except Exception as e:
+            print(f"   ⚠️ Attempt failed: {e}")
+            await asyncio.sleep(retry_delay)
+
+    if trash_data is None:
+        print("❌ Failed to connect to API after all retries")
+        return None, None
+
+    # If we got trash data, try to get weather data
+    try:
+        headers = {
+            "Authorization": f"Bearer {jwt_token}"
+        }
+
+        weather_url = f"{base_url}/api/Weather/"
+        print(f"🌤️ Getting weather data: {weather_url}")
+
+        weather_response = await client.get(weather_url, headers=headers, timeout=15)
+
+        if weather_response.status_code == 200:
+            weather_data = weather_response.json()
+            print(f"✅ Weather data loaded! {len(weather_data)} records")
+        else:
+            print(f"⚠️  Weather API returned status {weather_response.status_code}")
+            print("⚠️  Continuing with trash data only")
+
+    except Exception as e:
+        print(f"⚠️  Weather API error: {e}")
+        print("⚠️  Continuing with trash data only")
+
+    return trash_data, weather_data
@@ -0,0 +1,361 @@
+import asyncio
+import math
+from datetime import datetime, timedelta
+from typing import Dict, List
+
+import numpy as np
+from fastapi import HTTPException
+from pydantic import BaseModel
+
+import Config
+from ConfidenceEngine import tree_outputs, consensus_confidence
+from FeatureStore import feature_matrix
+from TrainingWorker import require_ready
+from WeatherCache import snap_coordinates
+from WeatherClient import forecast_window
+
+# Response category -> model (training) category
+CATEGORY_MAPPING = {
+    'Plastic': 'Plastic',
+    'Paper': 'Papier',
+    'Organic': 'Organisch',
+    'Glass': 'Glas'
+}
+
+DATA_SOURCE = "TrashItems API + Weather API"
+
+
+class PredictionRequest(BaseModel):
+    date: str 
+    latitude: float = 51.5890  # Default voor Breda centrum
+    longitude: float = 4.7750  # Default voor Breda centrum
+
+class PredictionResponse(BaseModel):
+    date: str 
+    latitude: float
+    longitude: float
+    temperature: float 
+    weather_description: str 
+    weather_source: str
+    predictions: Dict[str, int]
+    confidence_scores: Dict[str, float]
+    model_used_per_category: Dict[str, str] = {}
+    data_source: str
+
+class BatchPredictionRequest(BaseModel):
+    rows: List[PredictionRequest]
+
+class BatchPredictionResponse(BaseModel):
+    predictions: List[PredictionResponse]
+    model_version: int
+    weather_lookups: int
+
+class HeatmapRequest(BaseModel):
+    date: str
+    # Default: Breda centrum
+    min_latitude: float = 51.570
+    min_longitude: float = 4.740
+    max_latitude: float = 51.610
+    max_longitude: float = 4.810
+    resolution: float = 0.002  # Cell size in degrees
+
+class HeatmapResponse(BaseModel):
+    """Row-major grid: cell (i, j) is at latitudes[i], longitudes[j] and has index i * shape[1] + j.
+
+    points holds [latitude, longitude, intensity] per cell, intensity being the total
+    prediction scaled to 0..1, ready for L.heatLayer on the Map page.
+    """
+    date: str
+    resolution: float
+    shape: List[int]
+    latitudes: List[float]
+    longitudes: List[float]
+    predictions: Dict[str, List[int]]
+    confidence_scores: Dict[str, List[float]]
+    total: List[int]
+    points: List[List[float]]
+    model_used_per_category: Dict[str, str]
+    model_version: int
+    weather_lookups: int
+
+class ForecastRequest(BaseModel):
+    start_date: str
+    days: int = 7
+    latitude: float = 51.5890  # Default voor Breda centrum
+    longitude: float = 4.7750  # Default voor Breda centrum
+
+class ForecastResponse(BaseModel):
+    """One entry per day in every list, in the order of `dates`"""
+    start_date: str
+    latitude: float
+    longitude: float
+    dates: List[str]
+    temperature: List[float]
+    weather_description: List[str]
+    weather_source: List[str]
+    predictions: Dict[str, List[int]]
+    confidence_scores: Dict[str, List[float]]
+    model_used_per_category: Dict[str, str]
+    model_version: int
+    data_source: str
+
+
+async def weather_per_cell(rows, get_weather):
+    """Weather for every (date, latitude, longitude) row, fetched once per unique date and weather grid cell.
+
+    Returns (weather per row, number of unique lookups).
+    """
+    keys = [(date_str, *snap_coordinates(latitude, longitude)) for date_str, latitude, longitude in rows]
+    unique = list(dict.fromkeys(keys))
+    results = await asyncio.gather(*(get_weather(*key) for key in unique))
+    lookup = dict(zip(unique, results))
+    return [lookup[key] for key in keys], len(unique)
+
+
+def grid_shape(min_latitude: float, max_latitude: float, min_longitude: float, max_longitude: float,
+               resolution: float):
+    """(rows, columns) of the grid, computed without allocating it so callers can check the size first"""
+    rows = max(1, math.ceil(round((max_latitude - min_latitude) / resolution, 9)))
+    columns = max(1, math.ceil(round((max_longitude - min_longitude) / resolution, 9)))
+    return rows, columns
+
+
+def grid_axes(min_latitude: float, max_latitude: float, min_longitude: float, max_longitude: float,
+              resolution: float):
+    """Cell centers of a bounding box split into square cells of `resolution` degrees"""
+    rows, columns = grid_shape(min_latitude, max_latitude, min_longitude, max_longitude, resolution)
+    latitudes = np.round(min_latitude + (np.arange(rows) + 0.5) * resolution, 6)
+    longitudes = np.round(min_longitude + (np.arange(columns) + 0.5) * resolution, 6)
+    return latitudes, longitudes
+
+
+def decision_tree_confidence(model, X):
+    """Leaf statistics confidence of a Decision Tree for every row (see calculate_prediction_confidence)"""
+    tree = model.tree_
+    leaves = model.apply(X)
+    path_depth = np.diff(model.decision_path(X).indptr)
+
+    sample_ratio = tree.n_node_samples[leaves] / tree.n_node_samples[0]
+    sample_confidence = np.minimum(0.6, sample_ratio * 5.0)
+    purity_confidence = np.minimum(0.4, np.maximum(0.1, 1.0 - tree.impurity[leaves]))
+    depth_confidence = np.minimum(0.2, path_depth / 10.0)
+    total_confidence = sample_confidence + purity_confidence + depth_confidence
+    return np.round(np.clip(total_confidence, 0.2, 0.9), 3)
+
+
+def predict_matrix(snapshot, X):
+    """Run every model of a snapshot once over a feature matrix.
+
+    Returns (predictions, confidence_scores, model_used_per_category): rounded, non-negative
+    predictions and confidences as one array per response category, plus the model type used.
+    Multi-output models shared by several categories are evaluated once.
+    """
+    predictions, confidence_scores, model_used = {}, {}, {}
+    shared_outputs = {}
+    zeros = np.zeros(len(X))
+
+    for category, model_category in CATEGORY_MAPPING.items():
+        if model_category in snapshot.rf_models:
+            model, model_type = snapshot.rf_models[model_category], "random_forest"
+        elif model_category in snapshot.dt_models:
+            model, model_type = snapshot.dt_models[model_category], "decision_tree"
+        else:
+            predictions[category], confidence_scores[category], model_used[category] = zeros, zeros, "none"
+            continue
+
+        try:
+            if id(model) not in shared_outputs:
+                trees = tree_outputs(model, X) if hasattr(model, 'estimators_') else None
+                shared_outputs[id(model)] = (model.predict(X), trees)
+            values, trees = shared_outputs[id(model)]
+
+            output_column = snapshot.output_columns.get(model_category)
+            if output_column is not None:
+                values = values[:, output_column]
+            if trees is not None:
+                confidence = consensus_confidence(trees[:, output_column or 0])
+            else:
+                confidence = decision_tree_confidence(model, X)
+
+            predictions[category] = np.maximum(0, np.round(values))
+            confidence_scores[category] = confidence
+            model_used[category] = model_type
+        except Exception as e:
+            print(f"Error predicting {category}: {e}")
+            predictions[category], confidence_scores[category], model_used[category] = zeros, zeros, "error"
+
+    return predictions, confidence_scores, model_used
+
+
+async def predict_batch(models, rows, get_weather):
+    """Predictions for many rows with one snapshot of a SnapshotHolder: one feature matrix, every model run once over it"""
+    snapshot = models.current
+    if not rows:
+        return BatchPredictionResponse(predictions=[], model_version=snapshot.version, weather_lookups=0)
+    weather, weather_lookups = await weather_per_cell(
+        [(row.date, row.latitude, row.longitude) for row in rows], get_weather
+    )
+
+    X = feature_matrix([row.date for row in rows], [row.latitude for row in rows], [row.longitude for row in rows],
+                       [w['temperature'] for w in weather], [w['weather_description'] for w in weather])
+    predictions, confidence_scores, model_used_per_category = predict_matrix(snapshot, X)
+
+    return BatchPredictionResponse(
+        predictions=[PredictionResponse(
+            date=row.date,
+            latitude=row.latitude,
+            longitude=row.longitude,
+            temperature=weather[index]['temperature'],
+            weather_description=weather[index]['weather_description'],
+            weather_source=weather[index]['weather_source'],
+            predictions={category: int(values[index]) for category, values in predictions.items()},
+            confidence_scores={category: float(values[index]) for category, values in confidence_scores.items()},
+            model_used_per_category=model_used_per_category,
+            data_source=DATA_SOURCE
+        ) for index, row in enumerate(rows)],
+        model_version=snapshot.version,
+        weather_lookups=weather_lookups
+    )
+
+
+async def handle_batch(request: BatchPredictionRequest, models, model_status, get_weather):
+    """Batch endpoint of one model set: readiness, size and date checks, then predict_batch"""
+    require_ready(model_status)
+    if len(request.rows) > Config.PREDICTION_BATCH_MAX_ROWS:
+        raise HTTPException(status_code=413, detail=f"At most {Config.PREDICTION_BATCH_MAX_ROWS} rows per batch")
+
+    try:
+        for row in request.rows:
+            datetime.strptime(row.date, '%Y-%m-%d')
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=f"Invalid date format. Use YYYY-MM-DD: {str(e)}")
+
+    try:
+        return await predict_batch(models, request.rows, get_weather)
+    except Exception as e:
+        print(f"Batch prediction error: {e}")
+        import traceback
+        traceback.print_exc()
+        raise HTTPException(status_code=500, detail=f"Batch prediction failed: {str(e)}")
+
+
+async def predict_forecast(models, start_date: str, days: int, latitude: float, longitude: float, get_weather_range):
+    """Columnar predictions for consecutive days at one location with one snapshot and one model pass.
+
+    get_weather_range(start_date, days, latitude, longitude) returns the weather of every day.
+    """
+    snapshot = models.current
+    start = datetime.strptime(start_date, '%Y-%m-%d').date()
+    dates = [(start + timedelta(days=offset)).isoformat() for offset in range(days)]
+
+    weather = await get_weather_range(start_date, days, latitude, longitude)
+    temperatures = [w['temperature'] for w in weather]
+    descriptions = [w['weather_description'] for w in weather]
+
+    X = feature_matrix(dates, [latitude] * days, [longitude] * days, temperatures, descriptions)
+    predictions, confidence_scores, model_used_per_category = predict_matrix(snapshot, X)
+
+    return ForecastResponse(
+        start_date=start_date,
+        latitude=latitude,
+        longitude=longitude,
+        dates=dates,
+        temperature=temperatures,
+        weather_description=descriptions,
+        weather_source=[w['weather_source'] for w in weather],
+        predictions={category: [int(value) for value in values] for category, values in predictions.items()},
+        confidence_scores={category: [float(value) for value in values] for category, values in confidence_scores.items()},
+        model_used_per_category=model_used_per_category,
+        model_version=snapshot.version,
+        data_source=DATA_SOURCE
+    )
+
+
+async def handle_forecast(request: ForecastRequest, models, model_status, get_weather_range):
+    """Forecast endpoint of one model set: readiness, range and date checks, then predict_forecast"""
+    require_ready(model_status)
+    try:
+        start = datetime.strptime(request.start_date, '%Y-%m-%d').date()
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=f"Invalid date format. Use YYYY-MM-DD: {str(e)}")
+
+    # Every requested day must lie in the forecast block; days outside it would get made-up weather
+    first, last = forecast_window(Config.WEATHER_FORECAST_DAYS)
+    if request.days < 1 or start < first or start + timedelta(days=request.days - 1) > last:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Forecast days must lie between {first.isoformat()} and {last.isoformat()}"
+        )
+
+    try:
+        return await predict_forecast(models, request.start_date, request.days, request.latitude, request.longitude,
+                                      get_weather_range)
+    except Exception as e:
+        print(f"Forecast prediction error: {e}")
+        import traceback
+        traceback.print_exc()
+        raise HTTPException(status_code=500, detail=f"Forecast prediction failed: {str(e)}")
+
+
+async def predict_heatmap(models, date_str: str, latitudes, longitudes, resolution: float, get_weather):
+    """Grid predictions for one date: weather once per snapped weather cell, every model run once over all cells"""
+    snapshot = models.current
+    cell_latitudes = np.repeat(latitudes, len(longitudes))
+    cell_longitudes = np.tile(longitudes, len(latitudes))
+    cells = len(cell_latitudes)
+
+    weather, weather_lookups = await weather_per_cell(
+        [(date_str, latitude, longitude) for latitude, longitude in zip(cell_latitudes, cell_longitudes)],
+        get_weather
+    )
+    X = feature_matrix([date_str] * cells, cell_latitudes, cell_longitudes,
+                       [w['temperature'] for w in weather], [w['weather_description'] for w in weather])
+    predictions, confidence_scores, model_used_per_category = predict_matrix(snapshot, X)
+
+    total = np.sum(list(predictions.values()), axis=0) if predictions else np.zeros(cells)
+    peak = float(total.max()) if cells else 0.0
+    intensity = np.round(total / peak, 3) if peak > 0 else np.zeros(cells)
+
+    return HeatmapResponse(
+        date=date_str,
+        resolution=resolution,
+        shape=[len(latitudes), len(longitudes)],
+        latitudes=latitudes.tolist(),
+        longitudes=longitudes.tolist(),
+        predictions={category: values.astype(int).tolist() for category, values in predictions.items()},
+        confidence_scores={category: values.tolist() for category, values in confidence_scores.items()},
+        total=total.astype(int).tolist(),
+        points=np.column_stack([cell_latitudes, cell_longitudes, intensity]).tolist(),
+        model_used_per_category=model_used_per_category,
+        model_version=snapshot.version,
+        weather_lookups=weather_lookups
+    )
+
+
+async def handle_heatmap(request: HeatmapRequest, models, model_status, get_weather):
+    """Heatmap endpoint of one model set: readiness, bounding box, size cap and date checks, then predict_heatmap"""
+    require_ready(model_status)
+    bounds = (request.min_latitude, request.max_latitude, request.min_longitude, request.max_longitude,
+              request.resolution)
+    # Checked here rather than with Field constraints: a 422 echoes the input, and inf/nan cannot be serialized
+    if not all(math.isfinite(value) for value in bounds) or request.resolution <= 0:
+        raise HTTPException(status_code=400, detail="Bounding box and resolution must be finite, resolution > 0")
+    if request.min_latitude >= request.max_latitude or request.min_longitude >= request.max_longitude:
+        raise HTTPException(status_code=400, detail="Invalid bounding box")
+    rows, columns = grid_shape(*bounds)
+    if rows * columns > Config.HEATMAP_MAX_CELLS:
+        raise HTTPException(status_code=413, detail=f"At most {Config.HEATMAP_MAX_CELLS} grid cells per heatmap")
+    latitudes, longitudes = grid_axes(*bounds)
+
+    try:
+        datetime.strptime(request.date, '%Y-%m-%d')
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=f"Invalid date format. Use YYYY-MM-DD: {str(e)}")
+
+    try:
+        return await predict_heatmap(models, request.date, latitudes, longitudes, request.resolution, get_weather)
+    except Exception as e:
+        print(f"Heatmap prediction error: {e}")
+        import traceback
+        traceback.print_exc()
+        raise HTTPException(status_code=500, detail=f"Heatmap prediction failed: {str(e)}")
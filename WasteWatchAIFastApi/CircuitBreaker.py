@@ -0,0 +1,94 @@
+import threading
+import time
+from collections import deque
+from datetime import datetime
+
+
+class CircuitOpenError(Exception):
+    """Raised instead of calling an upstream whose circuit is open"""
+
+
+class CircuitBreaker:
+    """Failure and latency based circuit breaker for an upstream service.
+
+    closed    -> calls go through; failures and slow calls inside `window_seconds` are counted
+    open      -> calls are rejected immediately for `open_seconds`
+    half_open -> one trial call (or a background probe) decides between closed and open
+    """
+
+    def __init__(self, name: str, failure_threshold: int = 3, window_seconds: float = 60,
+                 open_seconds: float = 30, slow_call_seconds: float = 5):
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.window_seconds = window_seconds
+        self.open_seconds = open_seconds
+        self.slow_call_seconds = slow_call_seconds
+
+        self.state = "closed"
+        self.opened_at = None
+        self.last_error = None
+        self.avg_latency = None
+        self.rejected = 0
+        self._failures = deque()
+        self._trial_in_flight = False
+        self._lock = threading.Lock()
+
+    def allow_request(self) -> bool:
+        with self._lock:
+            if self.state == "closed":
+                return True
+            if self.state == "open" and time.time() - self.opened_at >= self.open_seconds:
+                self.state = "half_open"
+            if self.state == "half_open" and not self._trial_in_flight:
+                self._trial_in_flight = True
+                return True
+            self.rejected += 1
+            return False
+
+    def is_open(self) -> bool:
+        return self.state != "closed"
+
+    def record_success(self, latency: float):
+        with self._lock:
+            self.avg_latency = latency if self.avg_latency is None else 0.8 * self.avg_latency + 0.2 * latency
+            self._trial_in_flight = False
+            if latency > self.slow_call_seconds:
+                # Slow answers count against the upstream as well
+                self._register_failure(f"slow call ({latency:.1f}s)")
+            elif self.state != "closed":
+                print(f"✅ Circuit '{self.name}' closed again")
+                self.state = "closed"
+                self._failures.clear()
+
+    def cancel_trial(self):
+        """The trial call was cancelled before it produced an outcome"""
+        with self._lock:
+            self._trial_in_flight = False
+
+    def record_failure(self, error):
+        with self._lock:
+            self._trial_in_flight = False
+            self._register_failure(str(error))
+
+    def _register_failure(self, error: str):
+        now = time.time()
+        self.last_error = error
+        self._failures.append(now)
+        while self._failures and self._failures[0] < now - self.window_seconds:
+            self._failures.popleft()
+
+        if self.state == "half_open" or len(self._failures) >= self.failure_threshold:
+            if self.state != "open":
+                print(f"⚡ Circuit '{self.name}' opened: {error}")
+            self.state = "open"
+            self.opened_at = now
+
+    def snapshot(self):
+        return {
+            'state': self.state,
+            'recent_failures': len(self._failures),
+            'last_error': self.last_error,
+            'avg_latency_seconds': round(self.avg_latency, 3) if self.avg_latency is not None else None,
+            'rejected_calls': self.rejected,
+            'opened_at': datetime.fromtimestamp(self.opened_at).isoformat() if self.state != "closed" else None
+        }
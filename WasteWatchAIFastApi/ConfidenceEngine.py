@@ -0,0 +1,81 @@
+import threading
+import weakref
+
+import numpy as np
+
+# Node arrays per fitted forest, built on first use and dropped together with the model
+_forest_arrays = weakref.WeakKeyDictionary()
+_lock = threading.Lock()
+
+TREE_LEAF = -1
+
+
+class ForestArrays:
+    """All trees of a forest as padded (n_trees, max_nodes) node arrays plus a leaf-value table"""
+
+    def __init__(self, forest):
+        trees = [estimator.tree_ for estimator in forest.estimators_]
+        shape = (len(trees), max(tree.node_count for tree in trees))
+        self.left = np.full(shape, TREE_LEAF, dtype=np.intp)
+        self.right = np.full(shape, TREE_LEAF, dtype=np.intp)
+        self.feature = np.zeros(shape, dtype=np.intp)
+        self.threshold = np.zeros(shape)
+        self.values = np.zeros(shape + (trees[0].n_outputs,))
+        for index, tree in enumerate(trees):
+            count = tree.node_count
+            self.left[index, :count] = tree.children_left
+            self.right[index, :count] = tree.children_right
+            # Leaves have feature -2; any valid column works since they are never split on
+            self.feature[index, :count] = np.maximum(tree.feature, 0)
+            self.threshold[index, :count] = tree.threshold
+            # Regression trees store the mean target of each node in value[:, output, 0]
+            self.values[index, :count] = tree.value[:, :, 0]
+        self.max_depth = max(tree.max_depth for tree in trees)
+
+
+def forest_arrays(forest) -> ForestArrays:
+    with _lock:
+        arrays = _forest_arrays.get(forest)
+        if arrays is None:
+            arrays = _forest_arrays[forest] = ForestArrays(forest)
+        return arrays
+
+
+def tree_outputs(forest, X):
+    """Every tree's prediction for every row, shape (n_samples, n_outputs, n_trees).
+
+    All trees are traversed at once, one array step per tree level, and the predictions are
+    gathered from the leaf-value table instead of calling predict on every tree.
+    """
+    # sklearn compares float32 inputs against float64 thresholds; do the same for identical leaves
+    X = np.asarray(X, dtype=np.float32)
+    if np.isnan(X).any():
+        # Missing values follow per-node rules, leave those to sklearn
+        leaves = forest.apply(X)
+        arrays = forest_arrays(forest)
+    else:
+        arrays = forest_arrays(forest)
+        trees = np.arange(arrays.left.shape[0])
+        rows = np.arange(X.shape[0])[:, None]
+        leaves = np.zeros((X.shape[0], len(trees)), dtype=np.intp)
+        for _ in range(arrays.max_depth):
+            left = arrays.left[trees, leaves]
+            split = left != TREE_LEAF
+            if not split.any():
+                break
+            go_left = X[rows, arrays.feature[trees, leaves]] <= arrays.threshold[trees, leaves]
+            leaves = np.where(split, np.where(go_left, left, arrays.right[trees, leaves]), leaves)
+
+    outputs = arrays.values[np.arange(arrays.values.shape[0]), leaves]
+    # Trees last and contiguous, so reductions sum in the same order as over a 1-D array
+    return np.ascontiguousarray(outputs.transpose(0, 2, 1))
+
+
+def consensus_confidence(outputs):
+    """Tree consensus over the last axis: 1 - std/|mean| within [0.3, 0.9], and 0.3 when the mean is 0"""
+    mean = outputs.mean(axis=-1)
+    std = outputs.std(axis=-1)
+    zero = mean == 0
+    relative_std = std / np.where(zero, 1.0, np.abs(mean))
+    confidence = np.where(zero, 0.3, np.clip(1.0 - relative_std, 0.3, 0.9))
+    return np.round(confidence, 3)
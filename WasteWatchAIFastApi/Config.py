@@ -0,0 +1,115 @@
+import json
+import os
+
+# Runtime configuration for the FastAPI service.
+# Every setting can be overridden with an environment variable of the same name.
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+
+# Directory for local caches and artifacts (not part of the repo)
+CACHE_DIR = os.getenv("CACHE_DIR", os.path.join(BASE_DIR, "cache"))
+
+# Upstream services (point these at LocalStandIn.py for offline benchmarks and tests)
+BACKEND_BASE_URL = os.getenv("BACKEND_BASE_URL", "http://host.docker.internal:8080")
+BACKEND_MAX_RETRIES = int(os.getenv("BACKEND_MAX_RETRIES", "60"))  # Container startup can be slow
+BACKEND_RETRY_DELAY_SECONDS = float(os.getenv("BACKEND_RETRY_DELAY_SECONDS", "10"))
+OPEN_METEO_ARCHIVE_URL = os.getenv("OPEN_METEO_ARCHIVE_URL", "https://archive-api.open-meteo.com/v1/archive")
+OPEN_METEO_FORECAST_URL = os.getenv("OPEN_METEO_FORECAST_URL", "https://api.open-meteo.com/v1/forecast")
+OPEN_METEO_HISTORICAL_FORECAST_URL = os.getenv(
+    "OPEN_METEO_HISTORICAL_FORECAST_URL", "https://historical-forecast-api.open-meteo.com/v1/forecast"
+)
+
+# Weather cache
+WEATHER_CACHE_PATH = os.getenv("WEATHER_CACHE_PATH", os.path.join(CACHE_DIR, "weather_cache.sqlite"))
+WEATHER_FORECAST_TTL_SECONDS = int(os.getenv("WEATHER_FORECAST_TTL_SECONDS", "3600"))
+# Weather lookups are snapped to this grid (degrees) so nearby points share one series.
+# 0.1 matches the ERA5-Land grid behind the Open-Meteo archive API.
+WEATHER_GRID_DEGREES = float(os.getenv("WEATHER_GRID_DEGREES", "0.1"))
+WEATHER_FORECAST_DAYS = int(os.getenv("WEATHER_FORECAST_DAYS", "16"))
+
+# Shared async HTTP client
+HTTP_TIMEOUT_SECONDS = float(os.getenv("HTTP_TIMEOUT_SECONDS", "15"))
+HTTP_MAX_CONNECTIONS = int(os.getenv("HTTP_MAX_CONNECTIONS", "100"))
+HTTP_MAX_KEEPALIVE_CONNECTIONS = int(os.getenv("HTTP_MAX_KEEPALIVE_CONNECTIONS", "20"))
+
+# Weather endpoint fallback: "sequential", "race" or "hedge"
+WEATHER_FALLBACK_MODE = os.getenv("WEATHER_FALLBACK_MODE", "hedge")
+WEATHER_HEDGE_DELAY_SECONDS = float(os.getenv("WEATHER_HEDGE_DELAY_SECONDS", "2"))
+WEATHER_FETCH_DEADLINE_SECONDS = float(os.getenv("WEATHER_FETCH_DEADLINE_SECONDS", "20"))
+
+# Circuit breaker around the Open-Meteo upstreams
+CIRCUIT_FAILURE_THRESHOLD = int(os.getenv("CIRCUIT_FAILURE_THRESHOLD", "3"))
+CIRCUIT_WINDOW_SECONDS = float(os.getenv("CIRCUIT_WINDOW_SECONDS", "60"))
+CIRCUIT_OPEN_SECONDS = float(os.getenv("CIRCUIT_OPEN_SECONDS", "30"))
+CIRCUIT_SLOW_CALL_SECONDS = float(os.getenv("CIRCUIT_SLOW_CALL_SECONDS", "5"))
+CIRCUIT_PROBE_INTERVAL_SECONDS = float(os.getenv("CIRCUIT_PROBE_INTERVAL_SECONDS", "15"))
+
+
+def _parse_hotspots(value: str):
+    """Parse "name:lat:lon;name:lat:lon" into a list of (name, lat, lon)"""
+    hotspots = []
+    for entry in filter(None, (part.strip() for part in value.split(";"))):
+        name, latitude, longitude = entry.rsplit(":", 2)
+        hotspots.append((name, float(latitude), float(longitude)))
+    return hotspots
+
+
+# Weather warmer: forecast pre-fetch for hotspot locations (defaults: mock data generator locations)
+WEATHER_HOTSPOTS = _parse_hotspots(os.getenv(
+    "WEATHER_HOTSPOTS",
+    "Grote Markt:51.5895:4.77575;"
+    "Centraal Station:51.5958:4.7792;"
+    "Valkenberg Park:51.5934:4.7796;"
+    "Havermarkt:51.59225:4.769;"
+    "Wilhelminapark:51.5863:4.7852"
+))
+WEATHER_WARMER_INTERVAL_SECONDS = float(os.getenv("WEATHER_WARMER_INTERVAL_SECONDS", "1800"))
+
+# Trained model artifacts (warm start when the training data fingerprint is unchanged)
+MODEL_STORE_DIR = os.getenv("MODEL_STORE_DIR", os.path.join(CACHE_DIR, "models"))
+
+# Background model training and readiness
+TRAINING_RETRY_DELAY_SECONDS = float(os.getenv("TRAINING_RETRY_DELAY_SECONDS", "60"))
+READINESS_RETRY_AFTER_SECONDS = int(os.getenv("READINESS_RETRY_AFTER_SECONDS", "10"))
+# Processes used to fit the category x model type combinations (1 = serial)
+TRAINING_WORKERS = int(os.getenv("TRAINING_WORKERS", str(os.cpu_count() or 1)))
+
+# Model layout
+# "per_category": one Decision Tree + Random Forest per waste category
+# "multi_output": one multi-output Decision Tree + Random Forest predicting all categories at once
+MODEL_MODE = os.getenv("MODEL_MODE", "per_category")
+# Hyperparameter overrides per model type as JSON, e.g. '{"random_forest": {"n_estimators": 50}}'
+MODEL_PARAMS = json.loads(os.getenv("MODEL_PARAMS", "{}"))
+
+# Hyperparameter search: successive halving over time-series folds within a wall-clock budget
+TUNING_DIR = os.getenv("TUNING_DIR", os.path.join(CACHE_DIR, "tuning"))
+TUNING_BUDGET_SECONDS = float(os.getenv("TUNING_BUDGET_SECONDS", "300"))
+TUNING_SPLITS = int(os.getenv("TUNING_SPLITS", "4"))
+TUNING_ETA = int(os.getenv("TUNING_ETA", "2"))
+
+# Single predictions kept per model set; cleared whenever new models are published
+PREDICTION_CACHE_MAX_ENTRIES = int(os.getenv("PREDICTION_CACHE_MAX_ENTRIES", "10000"))
+# Largest number of rows accepted by the /predict/*/batch endpoints
+PREDICTION_BATCH_MAX_ROWS = int(os.getenv("PREDICTION_BATCH_MAX_ROWS", "1000"))
+# Largest number of grid cells evaluated by the /predict/*/heatmap endpoints
+HEATMAP_MAX_CELLS = int(os.getenv("HEATMAP_MAX_CELLS", "20000"))
+
+# Incremental trash ingestion: local store of downloaded items, re-fetched with `since=<watermark - lookback>`
+TRASH_STORE_DIR = os.getenv("TRASH_STORE_DIR", os.path.join(CACHE_DIR, "trash"))
+# Materialized daily feature tables, one per data source
+FEATURE_STORE_DIR = os.getenv("FEATURE_STORE_DIR", os.path.join(CACHE_DIR, "features"))
+INGEST_LOOKBACK_HOURS = float(os.getenv("INGEST_LOOKBACK_HOURS", "48"))
+
+# Admin endpoints (reload, tuning, retraining, caches): requests must send it in the X-Admin-Token header.
+# When empty the admin endpoints are disabled and answer 403.
+ADMIN_TOKEN = os.getenv("ADMIN_TOKEN", "")
+
+# Drift-based retraining: check new data every interval, retrain only on drift or data growth
+RETRAIN_CHECK_INTERVAL_SECONDS = float(os.getenv("RETRAIN_CHECK_INTERVAL_SECONDS", "3600"))
+RETRAIN_MIN_NEW_DAYS = int(os.getenv("RETRAIN_MIN_NEW_DAYS", "3"))
+# Mean shift of a category's daily count, in training standard deviations
+RETRAIN_DRIFT_THRESHOLD = float(os.getenv("RETRAIN_DRIFT_THRESHOLD", "1.0"))
+# Variance ratio (new / training) outside [1/x, x] counts as drift
+RETRAIN_VARIANCE_RATIO = float(os.getenv("RETRAIN_VARIANCE_RATIO", "2.0"))
+# New items as a fraction of the training items
+RETRAIN_GROWTH_THRESHOLD = float(os.getenv("RETRAIN_GROWTH_THRESHOLD", "0.25"))
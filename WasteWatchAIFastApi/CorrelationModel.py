@@ -1,16 +1,19 @@
 from fastapi import FastAPI, UploadFile, File, HTTPException
 from fastapi.middleware.cors import CORSMiddleware
 import pandas as pd
-import requests
 from sklearn.ensemble import RandomForestClassifier
 from sklearn.model_selection import train_test_split
 from sklearn.preprocessing import LabelEncoder
 import numpy as np
 from datetime import datetime, timedelta
 from pydantic import BaseModel
-from typing import List
+from typing import List, Optional
 import json
 from fastapi import APIRouter
+from WeatherCache import weather_cache, snap_coordinates
+import Config
+from WeatherClient import weather_client, ARCHIVE_URL, FORECAST_URL, HISTORICAL_FORECAST_URL
+from WeatherEncoding import categorize_codes
 
 router = APIRouter()
 
@@ -27,6 +30,7 @@ class CorrelationRequest(BaseModel):
     latitude: float = 51.5912 ## Default Breda
     longitude: float = 4.7761
     days_back: int = 31
+    deadline_seconds: Optional[float] = None  # Max wait for weather data
 
 class CorrelationResponse(BaseModel):
     correlation_coefficient: float
@@ -37,100 +41,57 @@ class CorrelationResponse(BaseModel):
     insights: List[str]
     chart_data: dict
 
-async def fetch_weather_data(latitude: float, longitude: float, start_date: str, end_date: str):
+async def fetch_weather_data(latitude: float, longitude: float, start_date: str, end_date: str,
+                             deadline: Optional[float] = None, mode: str = Config.WEATHER_FALLBACK_MODE):
     print(f"Fetching weather data for coordinates: {latitude}, {longitude}")
     print(f"Date range: {start_date} to {end_date}")
     
-    # First try historical archive API for past data (best for data older than 7 days)
-    url = f"https://archive-api.open-meteo.com/v1/archive"
-    params = {
-        "latitude": latitude,
-        "longitude": longitude,
-        "start_date": start_date,
-        "end_date": end_date,
-        "daily": "temperature_2m_max,temperature_2m_min,precipitation_sum,weather_code",
-        "timezone": "Europe/Amsterdam"
-    }
+    # Snap to the weather grid so the upstream request and the cache share one point
+    latitude, longitude = snap_coordinates(latitude, longitude)
     
-    try:
-        print(f"Trying archive API: {url}")
-        response = requests.get(url, params=params, timeout=15)
-        print(f"Archive API response status: {response.status_code}")
-        
-        if response.status_code == 200:
-            data = response.json()
-            if data.get("daily") and data["daily"].get("time"):
-                print(f"SUCCESS: Fetched REAL weather data from archive API for {len(data['daily']['time'])} days")
-                print(f"Sample real temps: {data['daily']['temperature_2m_max'][:3]} max, {data['daily']['temperature_2m_min'][:3]} min")
-                print(f"DATA SOURCE: OPEN-METEO ARCHIVE API (REAL DATA)")
-                return data
-            else:
-                print("Archive API returned empty data structure")
-        else:
-            print(f"Archive API failed with status {response.status_code}: {response.text[:200]}")
-    except Exception as e:
-        print(f"Archive API error: {e}")
+    daily_variables = ["temperature_2m_max", "temperature_2m_min", "precipitation_sum", "weather_code"]
+    cached = weather_cache.get_daily(latitude, longitude, start_date, end_date, daily_variables)
+    if cached is not None:
+        print(f"SUCCESS: Weather data for {len(cached['daily']['time'])} days served from cache")
+        print(f"DATA SOURCE: WEATHER CACHE (REAL DATA)")
+        return cached
     
-    # Fallback to forecast API for recent dates (last 7-14 days)
-    url = "https://api.open-meteo.com/v1/forecast"
     params = {
         "latitude": latitude,
         "longitude": longitude,
         "start_date": start_date,
         "end_date": end_date,
-        "daily": "temperature_2m_max,temperature_2m_min,precipitation_sum,weather_code",
-        "timezone": "Europe/Amsterdam",
-        "past_days": 92  # Try to get more historical data
+        "daily": ",".join(daily_variables),
+        "timezone": "Europe/Amsterdam"
     }
     
-    try:
-        print(f"🌐 Trying forecast API: {url}")
-        response = requests.get(url, params=params, timeout=15)
-        print(f"📡 Forecast API response status: {response.status_code}")
-        
-        if response.status_code == 200:
-            data = response.json()
-            if data.get("daily") and data["daily"].get("time"):
-                print(f"SUCCESS: Fetched REAL weather data from forecast API for {len(data['daily']['time'])} days")
-                print(f"Sample real temps: {data['daily']['temperature_2m_max'][:3]} max, {data['daily']['temperature_2m_min'][:3]} min")
-                print(f"DATA SOURCE: OPEN-METEO FORECAST API (REAL DATA)")
-                return data
-            else:
-                print("Forecast API returned empty data structure")
-        else:
-            print(f"Forecast API failed with status {response.status_code}: {response.text[:200]}")
-    except Exception as e:
-        print(f"Forecast API error: {e}")
+    attempts = [
+        # Historical archive API for past data (best for data older than 7 days)
+        ("archive API", ARCHIVE_URL, params),
+        # Forecast API for recent dates (last 7-14 days)
+        ("forecast API", FORECAST_URL, {**params, "past_days": 92}),
+        # Historical weather API (alternative)
+        ("historical API", HISTORICAL_FORECAST_URL, params)
+    ]
     
-    # Third try: Historical weather API (alternative)
-    try:
-        url = "https://historical-forecast-api.open-meteo.com/v1/forecast"
-        params = {
-            "latitude": latitude,
-            "longitude": longitude,
-            "start_date": start_date,
-            "end_date": end_date,
-            "daily": "temperature_2m_max,temperature_2m_min,precipitation_sum,weather_code",
-            "timezone": "Europe/Amsterdam"
-        }
-        
-        print(f"Trying historical forecast API: {url}")
-        response = requests.get(url, params=params, timeout=15)
-        print(f"Historical API response status: {response.status_code}")
-        
-        if response.status_code == 200:
-            data = response.json()
-            if data.get("daily") and data["daily"].get("time"):
-                print(f"SUCCESS: Fetched REAL weather data from historical API for {len(data['daily']['time'])} days")
-                print(f"Sample real temps: {data['daily']['temperature_2m_max'][:3]} max, {data['daily']['temperature_2m_min'][:3]} min")
-                print(f"DATA SOURCE: HISTORICAL FORECAST API (REAL DATA)")
-                return data
-            else:
-                print("Historical API returned empty data structure")
-        else:
-            print(f"Historical API failed with status {response.status_code}: {response.text[:200]}")
-    except Exception as e:
-        print(f"Historical API error: {e}")
+    # Race or hedge the endpoints and take the first valid daily payload
+    data = await weather_client.fetch_first_valid(
+        attempts,
+        mode=mode,
+        hedge_delay=Config.WEATHER_HEDGE_DELAY_SECONDS,
+        deadline=deadline if deadline is not None else Config.WEATHER_FETCH_DEADLINE_SECONDS
+    )
+    if data is not None:
+        print(f"SUCCESS: Fetched REAL weather data from {data['source']} for {len(data['daily']['time'])} days")
+        print(f"Sample real temps: {data['daily']['temperature_2m_max'][:3]} max, {data['daily']['temperature_2m_min'][:3]} min")
+        print(f"DATA SOURCE: OPEN-METEO {data['source'].upper()} (REAL DATA)")
+        return data
+    
+    # Upstream down or too slow: last cached values, even if they are stale
+    stale = weather_cache.get_daily(latitude, longitude, start_date, end_date, daily_variables, allow_expired=True)
+    if stale is not None:
+        print(f"DATA SOURCE: WEATHER CACHE (STALE, UPSTREAM UNAVAILABLE)")
+        return stale
     
     # Last resort: generate dummy data but warn user
     print(f"ALL WEATHER APIs FAILED - GENERATING DUMMY DATA FOR DEMONSTRATION")
@@ -196,37 +157,6 @@ def generate_dummy_weather_data(start_date: str, end_date: str):
 @router.post("/analyze", response_model=CorrelationResponse)
 async def analyze_correlation(request: CorrelationRequest):
     try:
-        # Define weather_code_to_category function first
-        def weather_code_to_category(code):
-            """Converts Open-Meteo weather code to a human-readable weather category."""
-            # Handle None values first
-            if code is None:
-                return "Onbekend"
-            
-            # Convert to int if it's a string or float
-            try:
-                code = int(code)
-            except (ValueError, TypeError):
-                return "Onbekend"
-            
-            # Open-Meteo weather codes: https://open-meteo.com/en/docs#api_form
-            if code == 0:
-                return "Zonnig"
-            elif code in [1, 2, 3]:
-                return "Gedeeltelijk bewolkt"
-            elif code in [45, 48]:
-                return "Mistig"
-            elif code in [51, 53, 55, 56, 57]:
-                return "Motregen"
-            elif code in [61, 63, 65, 66, 67, 80, 81, 82]:
-                return "Regenachtig"
-            elif code in [71, 73, 75, 77, 85, 86]:
-                return "Sneeuw"
-            elif code in [95, 96, 99]:
-                return "Onweer"
-            else:
-                return "Onbekend"
-        
         # Use exact Breda coordinates
         latitude = 51.5865  # Breda centrum
         longitude = 4.7761  # Breda centrum
@@ -239,7 +169,8 @@ async def analyze_correlation(request: CorrelationRequest):
             latitude, 
             longitude,
             start_date.strftime("%Y-%m-%d"),
-            end_date.strftime("%Y-%m-%d")
+            end_date.strftime("%Y-%m-%d"),
+            deadline=request.deadline_seconds
         )
         
         # Check if we got real or dummy data
@@ -320,16 +251,8 @@ async def analyze_correlation(request: CorrelationRequest):
             except (ValueError, TypeError):
                 avg_temps.append(12.5)  # Default average temp for Netherlands
         
-        # Safely convert weather codes to integers
-        safe_weather_codes = []
-        for code in weather_codes:
-            try:
-                if code is not None and code != '':
-                    safe_weather_codes.append(int(code))
-                else:
-                    safe_weather_codes.append(0)  # Default to clear sky
-            except (ValueError, TypeError):
-                safe_weather_codes.append(0)
+        # Safely convert weather codes to integers, missing codes default to clear sky
+        safe_weather_codes = pd.to_numeric(pd.Series(list(weather_codes), dtype=object), errors='coerce').fillna(0).astype(int).to_numpy()
         
         # Create dataframe for weather data
         weather_df = pd.DataFrame({
@@ -339,7 +262,7 @@ async def analyze_correlation(request: CorrelationRequest):
             'avg_temp': avg_temps,
             'precipitation': precipitation,
             'weather_code': safe_weather_codes,
-            'weather_category': [weather_code_to_category(code) for code in safe_weather_codes]
+            'weather_category': categorize_codes(safe_weather_codes)
         })
         
         print(f"Weather DataFrame created with {len(weather_df)} rows")
@@ -0,0 +1,134 @@
+import asyncio
+from collections import deque
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+
+import Config
+from FeatureStore import TARGETS
+
+# Most recent retrain decisions, newest last
+decisions = deque(maxlen=100)
+
+
+def training_window_stats(daily_data, targets=TARGETS):
+    """Per-category mean/variance of daily counts over the training window"""
+    days = pd.to_datetime(daily_data['datum'])
+    present = [target for target in targets if target in daily_data.columns]
+    return {
+        'first_day': days.min().date().isoformat(),
+        'last_day': days.max().date().isoformat(),
+        'days': int(len(daily_data)),
+        'items': float(daily_data[present].to_numpy().sum()),
+        'categories': {
+            target: {
+                'mean': float(daily_data[target].mean()),
+                'var': float(daily_data[target].var(ddof=0))
+            } for target in present
+        }
+    }
+
+
+def drift_report(daily_data, stats):
+    """Compare the days after the training window with the training window statistics"""
+    days = pd.to_datetime(daily_data['datum'])
+    new = daily_data[days > pd.Timestamp(stats['last_day'])]
+    categories = stats['categories']
+
+    report = {
+        'new_days': int(len(new)),
+        'new_items': float(new[[c for c in categories if c in new.columns]].to_numpy().sum()) if len(new) else 0.0,
+        'categories': {}
+    }
+    report['growth'] = round(report['new_items'] / stats['items'], 4) if stats['items'] else None
+
+    for target, baseline in categories.items():
+        if not len(new) or target not in new.columns:
+            continue
+        mean = float(new[target].mean())
+        var = float(new[target].var(ddof=0))
+        std = np.sqrt(baseline['var'])
+        report['categories'][target] = {
+            'mean': round(mean, 3),
+            'mean_shift': round(abs(mean - baseline['mean']) / std, 3) if std > 0 else None,
+            'variance_ratio': round(var / baseline['var'], 3) if baseline['var'] > 0 else None
+        }
+    return report
+
+
+def decide(report, min_new_days: int = Config.RETRAIN_MIN_NEW_DAYS,
+           drift_threshold: float = Config.RETRAIN_DRIFT_THRESHOLD,
+           variance_ratio: float = Config.RETRAIN_VARIANCE_RATIO,
+           growth_threshold: float = Config.RETRAIN_GROWTH_THRESHOLD):
+    """Return (retrain, reason) for a drift report"""
+    if report['new_days'] == 0:
+        return False, "no new data"
+    if report['growth'] is not None and report['growth'] >= growth_threshold:
+        return True, f"data growth {report['growth']:.0%}"
+    if report['new_days'] < min_new_days:
+        return False, f"only {report['new_days']} new days"
+
+    for target, values in report['categories'].items():
+        if values['mean_shift'] is not None and values['mean_shift'] >= drift_threshold:
+            return True, f"{target} mean shifted {values['mean_shift']} std"
+        ratio = values['variance_ratio']
+        if ratio is not None and (ratio >= variance_ratio or ratio <= 1 / variance_ratio):
+            return True, f"{target} variance ratio {ratio}"
+    return False, "no significant drift"
+
+
+class DriftSource:
+    """What the scheduler needs from a prediction module"""
+
+    def __init__(self, name: str, ingest, store, models):
+        self.name = name
+        self.ingest = ingest  # async (max_retries, retry_delay) -> (added, weather_data) or None
+        self.store = store  # TrashStore with the ingested daily counts
+        self.models = models  # SnapshotHolder with the published models and their training stats
+
+
+def record(name: str, retrain: bool, reason: str, report=None):
+    decision = {
+        'model': name,
+        'checked_at': datetime.now().isoformat(),
+        'retrain': retrain,
+        'reason': reason,
+        'report': report
+    }
+    decisions.append(decision)
+    print(f"{'🔄' if retrain else '🟰'} Retrain check '{name}': {reason}")
+    return decision
+
+
+async def check_source(source: DriftSource, retrain):
+    """Ingest new data, compute drift statistics and retrain through `retrain(name)` when needed"""
+    snapshot = source.models.current
+    if not snapshot:
+        return record(source.name, False, "models not loaded yet")
+    if not snapshot.data_stats:
+        return record(source.name, False, "no training statistics for the current models")
+
+    ingested = await source.ingest(max_retries=1, retry_delay=0)
+    if ingested is None:
+        return record(source.name, False, "backend unavailable")
+
+    report = await asyncio.to_thread(drift_report, source.store.daily_data(), snapshot.data_stats)
+    should_retrain, reason = decide(report)
+    decision = record(source.name, should_retrain, reason, report)
+    if should_retrain:
+        decision['retrained'] = bool(await retrain(source.name))
+    return decision
+
+
+async def run_retrain_scheduler(sources, retrain, interval: float = Config.RETRAIN_CHECK_INTERVAL_SECONDS):
+    """Periodically check every source for drift or growth and retrain only when needed"""
+    while True:
+        await asyncio.sleep(interval)
+        for source in sources:
+            try:
+                await check_source(source, retrain)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                record(source.name, False, f"check failed: {e}")
@@ -0,0 +1,179 @@
+import os
+import pickle
+import tempfile
+import threading
+
+import numpy as np
+import pandas as pd
+
+import Config
+from TrashStore import as_daily_rows
+from WeatherEncoding import encode_description, encode_descriptions
+
+# Bump when the feature engineering changes so cached tables and model artifacts are not reused
+FEATURE_VERSION = 2
+
+FEATURES = [
+    'latitude', 'longitude', 'year', 'month', 'day', 'weekday',
+    'temperatuur', 'weer_numeriek', 'is_weekend', 'seizoen'
+]
+TARGETS = ['Plastic', 'Papier', 'Organisch', 'Glas']
+
+# Month -> season: winter 0, spring 1, summer 2, autumn 3
+SEASONS = {
+    12: 0, 1: 0, 2: 0,
+    3: 1, 4: 1, 5: 1,
+    6: 2, 7: 2, 8: 2,
+    9: 3, 10: 3, 11: 3
+}
+
+DEFAULT_TEMPERATURE = 15.0
+DEFAULT_WEATHER = 'Bewolkt'
+
+
+def weather_inputs(weather_data) -> pd.DataFrame:
+    """Backend weather records as one row per day: datum, temperatuur, weersverwachting"""
+    weather_df = pd.DataFrame(weather_data or [])
+    if 'timestamp' in weather_df.columns:
+        weather_df['datum'] = pd.to_datetime(weather_df['timestamp']).dt.date
+        weather_df = weather_df.rename(columns={'temperature': 'temperatuur', 'weatherDescription': 'weersverwachting'})
+    elif 'Timestamp' in weather_df.columns:
+        weather_df['datum'] = pd.to_datetime(weather_df['Timestamp']).dt.date
+        weather_df = weather_df.rename(columns={'Temperature': 'temperatuur', 'WeatherDescription': 'weersverwachting'})
+    else:
+        return pd.DataFrame({'datum': [], 'temperatuur': [], 'weersverwachting': []})
+    return weather_df[['datum', 'temperatuur', 'weersverwachting']].drop_duplicates('datum', keep='last')
+
+
+def raw_inputs(daily_rows: pd.DataFrame, weather_data) -> pd.DataFrame:
+    """Daily trash rows joined with the raw weather of that day, before any feature engineering"""
+    inputs = pd.merge(daily_rows, weather_inputs(weather_data), on='datum', how='left')
+    return inputs[['datum'] + sorted(column for column in inputs.columns if column != 'datum')]
+
+
+def build_features(inputs: pd.DataFrame) -> pd.DataFrame:
+    """Calendar, weather and derived features for raw daily inputs; every row is computed on its own"""
+    daily_data = inputs.copy()
+    datum = pd.to_datetime(daily_data['datum'])
+    daily_data['year'] = datum.dt.year
+    daily_data['month'] = datum.dt.month
+    daily_data['day'] = datum.dt.day
+    daily_data['weekday'] = datum.dt.weekday
+
+    # Missing weather gets defaults (no fallback generation)
+    daily_data['temperatuur'] = daily_data['temperatuur'].astype(float).fillna(DEFAULT_TEMPERATURE)
+    daily_data['weersverwachting'] = daily_data['weersverwachting'].fillna(DEFAULT_WEATHER)
+
+    daily_data['is_weekend'] = (daily_data['weekday'] >= 5).astype(int)
+    daily_data['seizoen'] = daily_data['month'].map(SEASONS)
+    # Same encoding as prediction and correlation
+    daily_data['weer_numeriek'] = encode_descriptions(daily_data['weersverwachting'])
+    return daily_data
+
+
+def feature_table(trash_data, weather_data) -> pd.DataFrame:
+    """Training table from trash items or daily rows plus weather; a materialized table is returned as is"""
+    if isinstance(trash_data, pd.DataFrame) and set(FEATURES) <= set(trash_data.columns):
+        return trash_data
+    return build_features(raw_inputs(as_daily_rows(trash_data), weather_data))
+
+
+def feature_vector(date_obj, latitude: float, longitude: float, temperature: float, weather_description: str):
+    """Model input for one prediction, in FEATURES order and with the training encodings"""
+    weekday = date_obj.weekday()
+    return np.array([[
+        latitude, longitude, date_obj.year, date_obj.month, date_obj.day, weekday,
+        temperature, encode_description(weather_description), 1 if weekday >= 5 else 0, SEASONS[date_obj.month]
+    ]])
+
+
+def feature_matrix(dates, latitudes, longitudes, temperatures, weather_descriptions):
+    """Model inputs for many predictions at once, one row per prediction in FEATURES order"""
+    datum = pd.to_datetime(pd.Series(dates))
+    month = datum.dt.month.to_numpy()
+    weekday = datum.dt.weekday.to_numpy()
+    seasons = np.array([SEASONS.get(m, 0) for m in range(13)])
+    return np.column_stack([
+        np.asarray(latitudes, dtype=float), np.asarray(longitudes, dtype=float),
+        datum.dt.year.to_numpy(), month, datum.dt.day.to_numpy(), weekday,
+        np.asarray(temperatures, dtype=float), encode_descriptions(list(weather_descriptions)).to_numpy(),
+        (weekday >= 5).astype(int), seasons[month]
+    ]).astype(float)
+
+
+class FeatureStore:
+    """Materialized daily feature table of one data source, cached on disk and updated incrementally.
+
+    Each row keeps a hash of its raw inputs (daily counts, mean coordinates and weather), so an
+    update only recomputes days that are new or whose inputs changed since the last run.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self._lock = threading.Lock()
+        self._table = None
+        self.last_update = {}
+
+    def table(self, daily_rows: pd.DataFrame, weather_data) -> pd.DataFrame:
+        with self._lock:
+            inputs = raw_inputs(daily_rows, weather_data)
+            inputs_hash = pd.util.hash_pandas_object(inputs, index=False).to_numpy()
+
+            cached = self._table if self._table is not None else self._load()
+            if cached is not None and list(cached.columns[:len(inputs.columns)]) == list(inputs.columns):
+                previous = dict(zip(cached['datum'], cached['input_hash']))
+                unchanged = np.array([previous.get(datum) == value for datum, value in zip(inputs['datum'], inputs_hash)],
+                                     dtype=bool)
+                kept = cached[cached['datum'].isin(set(inputs['datum'][unchanged]))]
+            else:
+                unchanged = np.zeros(len(inputs), dtype=bool)
+                kept = None
+
+            self.last_update = {'rows': int(len(inputs)), 'recomputed': int((~unchanged).sum())}
+            if kept is not None and unchanged.all() and len(kept) == len(cached):
+                self._table = cached
+                return cached.copy()
+
+            changed = build_features(inputs[~unchanged]).assign(input_hash=inputs_hash[~unchanged])
+            parts = [part for part in (kept, changed) if part is not None and not part.empty]
+            table = pd.concat(parts, ignore_index=True) if len(parts) > 1 else (parts or [changed])[0]
+            table = table.sort_values('datum', kind='stable').reset_index(drop=True)
+            self._table = table
+            self._save(table)
+            print(f"🧮 Feature store {os.path.basename(self.path)}: "
+                  f"{self.last_update['recomputed']} of {len(table)} days recomputed")
+            return table.copy()
+
+    def _load(self):
+        if not os.path.exists(self.path):
+            return None
+        try:
+            with open(self.path, 'rb') as f:
+                cached = pickle.load(f)
+        except Exception as e:
+            print(f"⚠️  Could not read feature store {self.path}: {e}")
+            return None
+        return cached['table'] if cached.get('version') == FEATURE_VERSION else None
+
+    def _save(self, table: pd.DataFrame):
+        directory = os.path.dirname(self.path)
+        os.makedirs(directory, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=directory, suffix='.tmp')
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                pickle.dump({'version': FEATURE_VERSION, 'table': table}, f, protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(tmp_path, self.path)
+        except Exception as e:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            print(f"⚠️  Could not save feature store {self.path}: {e}")
+
+
+_feature_stores = {}
+
+
+def feature_store_for(name: str):
+    """One feature store per data source, shared by every model type trained on it"""
+    if name not in _feature_stores:
+        _feature_stores[name] = FeatureStore(os.path.join(Config.FEATURE_STORE_DIR, f"{name}_features.pkl"))
+    return _feature_stores[name]
@@ -0,0 +1,42 @@
+from typing import Optional
+
+import httpx
+
+import Config
+
+# Shared async HTTP client with keep-alive connection pooling.
+# Opened and closed by the lifespan hook in main.py.
+_client: Optional[httpx.AsyncClient] = None
+
+
+def _create_client():
+    return httpx.AsyncClient(
+        timeout=httpx.Timeout(Config.HTTP_TIMEOUT_SECONDS),
+        limits=httpx.Limits(
+            max_connections=Config.HTTP_MAX_CONNECTIONS,
+            max_keepalive_connections=Config.HTTP_MAX_KEEPALIVE_CONNECTIONS
+        )
+    )
+
+
+async def startup():
+    global _client
+    if _client is None:
+        _client = _create_client()
+        print("🔌 Shared HTTP client started")
+
+
+async def shutdown():
+    global _client
+    if _client is not None:
+        await _client.aclose()
+        _client = None
+        print("🔌 Shared HTTP client closed")
+
+
+def get_client() -> httpx.AsyncClient:
+    """Return the shared client, creating it lazily when used outside the app lifespan"""
+    global _client
+    if _client is None:
+        _client = _create_client()
+    return _client
@@ -0,0 +1,206 @@
+import itertools
+import json
+import multiprocessing
+import os
+import tempfile
+import time
+from datetime import datetime
+
+import numpy as np
+from sklearn.metrics import r2_score
+from sklearn.model_selection import TimeSeriesSplit
+
+import Config
+from TrainingEngine import MODEL_TYPES, build_model, trainable_targets
+
+SEARCH_SPACE = {
+    'decision_tree': {
+        'max_depth': [3, 5, 8, 12, None],
+        'min_samples_leaf': [1, 2, 5, 10]
+    },
+    'random_forest': {
+        'n_estimators': [25, 50, 100, 200],
+        'max_depth': [4, 8, 12, None],
+        'min_samples_leaf': [1, 2, 5]
+    }
+}
+
+# Single-row predictions timed per fitted model, the shape of one /predict request
+LATENCY_REPEATS = 20
+
+
+def candidates(space=SEARCH_SPACE, model_types=MODEL_TYPES):
+    """Every (model_type, params) combination of the search space"""
+    result = []
+    for model_type in model_types:
+        names = list(space[model_type])
+        for values in itertools.product(*(space[model_type][name] for name in names)):
+            result.append((model_type, dict(zip(names, values))))
+    return result
+
+
+def inference_latency_ms(model, row):
+    """Median wall time of a single-row prediction"""
+    timings = []
+    for _ in range(LATENCY_REPEATS):
+        started = time.perf_counter()
+        model.predict(row)
+        timings.append(time.perf_counter() - started)
+    return float(np.median(timings)) * 1000
+
+
+def evaluate_candidate(task):
+    """Fit one candidate on the given time-series folds; runs inside a worker process.
+
+    Returns (index, mean R² over folds and categories, latency of predicting every category for one row in ms).
+    """
+    index, model_type, params, X, Y, folds, multi_output = task
+    scores = []
+    latency_ms = 0.0
+    for fold, (train_index, test_index) in enumerate(folds):
+        if multi_output:
+            model = build_model(model_type, params).fit(X[train_index], Y[train_index])
+            scores.extend(r2_score(Y[test_index], model.predict(X[test_index]), multioutput='raw_values'))
+            if fold == len(folds) - 1:
+                latency_ms = inference_latency_ms(model, X[test_index][:1])
+            continue
+        for column in range(Y.shape[1]):
+            model = build_model(model_type, params).fit(X[train_index], Y[train_index, column])
+            scores.append(r2_score(Y[test_index, column], model.predict(X[test_index])))
+            if fold == len(folds) - 1:
+                latency_ms += inference_latency_ms(model, X[test_index][:1])
+    return index, float(np.mean(scores)), latency_ms
+
+
+def pareto_front(evaluations):
+    """Evaluations not dominated in (higher R², lower latency), cheapest first"""
+    front = []
+    for evaluation in sorted(evaluations, key=lambda e: (e['latency_ms'], -e['r2'])):
+        if not front or evaluation['r2'] > front[-1]['r2']:
+            front.append(evaluation)
+    return front
+
+
+def select_params(front, min_r2: float):
+    """Cheapest front entry that meets min_r2, or the most accurate one when none does"""
+    meeting = [entry for entry in front if entry['r2'] >= min_r2]
+    if meeting:
+        return min(meeting, key=lambda entry: entry['latency_ms'])
+    return max(front, key=lambda entry: entry['r2']) if front else None
+
+
+def _run_rung(tasks, pool, deadline):
+    """Evaluate a rung; results that do not finish before the deadline are dropped"""
+    if pool is None:
+        results = []
+        for task in tasks:
+            if time.monotonic() >= deadline:
+                break
+            results.append(evaluate_candidate(task))
+        return results, len(results) == len(tasks)
+
+    pending = [pool.apply_async(evaluate_candidate, (task,)) for task in tasks]
+    for result in pending:
+        result.wait(max(0.0, deadline - time.monotonic()))
+    done = [result for result in pending if result.ready()]
+    return [result.get() for result in done], len(done) == len(pending)
+
+
+def successive_halving(daily_data, features, targets, label, budget_seconds: float = Config.TUNING_BUDGET_SECONDS,
+                       workers: int = Config.TRAINING_WORKERS, mode: str = Config.MODEL_MODE,
+                       n_splits: int = Config.TUNING_SPLITS, eta: int = Config.TUNING_ETA, space=SEARCH_SPACE):
+    """Successive-halving search over the tree hyperparameters with time-series splits.
+
+    Rung k scores the surviving candidates on the latest eta**k folds of a TimeSeriesSplit, so
+    every fold only trains on days before the ones it is tested on; the best 1/eta move on
+    until all folds are used. Stops early when the wall-clock budget runs out, terminating
+    workers that are still fitting, and returns what was evaluated so far, including the
+    Pareto front of R² versus inference latency.
+    """
+    started = time.monotonic()
+    deadline = started + budget_seconds
+    if 'datum' in daily_data.columns:
+        daily_data = daily_data.sort_values('datum', kind='stable')
+    targets = trainable_targets(daily_data, targets, label)
+    X = daily_data[features].to_numpy(dtype=float)
+    Y = daily_data[targets].to_numpy(dtype=float)
+    all_folds = list(TimeSeriesSplit(n_splits=n_splits).split(X))
+    multi_output = mode == 'multi_output'
+
+    pool_candidates = candidates(space)
+    alive = list(range(len(pool_candidates)))
+    latest = {}
+    rungs = []
+    completed = True
+    workers = max(1, workers)
+    pool = None if workers == 1 else multiprocessing.get_context("spawn").Pool(processes=workers)
+    try:
+        rung = 0
+        while alive:
+            n_folds = min(n_splits, eta ** rung)
+            folds = all_folds[-n_folds:]
+            tasks = [(index, *pool_candidates[index], X, Y, folds, multi_output) for index in alive]
+            results, completed = _run_rung(tasks, pool, deadline)
+            for index, r2, latency_ms in results:
+                model_type, params = pool_candidates[index]
+                latest[index] = {'model_type': model_type, 'params': params, 'r2': round(r2, 4),
+                                 'latency_ms': round(latency_ms, 4), 'folds': n_folds}
+            rungs.append({'folds': n_folds, 'candidates': len(alive), 'evaluated': len(results)})
+            print(f"🔎 Rung {rung}: {len(results)}/{len(alive)} candidates on {n_folds} folds")
+
+            if not completed or n_folds == n_splits:
+                break
+            ranked = sorted((index for index, *_ in results), key=lambda index: -latest[index]['r2'])
+            alive = ranked[:max(1, len(ranked) // eta)]
+            rung += 1
+    finally:
+        if pool is not None:
+            # Out of budget: kill the workers, fits still running must not keep competing with inference
+            if completed:
+                pool.close()
+            else:
+                pool.terminate()
+            pool.join()
+
+    evaluations = list(latest.values())
+    return {
+        'label': label,
+        'mode': mode,
+        'created_at': datetime.now().isoformat(),
+        'budget_seconds': budget_seconds,
+        'elapsed_seconds': round(time.monotonic() - started, 2),
+        'completed': completed,
+        'days': int(len(X)),
+        'targets': targets,
+        'n_splits': n_splits,
+        'rungs': rungs,
+        'evaluations': len(evaluations),
+        'front': pareto_front(evaluations)
+    }
+
+
+def results_path(name: str):
+    return os.path.join(Config.TUNING_DIR, f"{name}_pareto.json")
+
+
+def save_results(name: str, results: dict):
+    """Write the search results atomically as JSON"""
+    os.makedirs(Config.TUNING_DIR, exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(dir=Config.TUNING_DIR, suffix='.tmp')
+    try:
+        with os.fdopen(fd, 'w') as f:
+            json.dump(results, f, indent=2)
+        os.replace(tmp_path, results_path(name))
+    except Exception:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+    print(f"💾 Saved Pareto front '{name}': {len(results['front'])} models")
+
+
+def load_results(name: str):
+    path = results_path(name)
+    if not os.path.exists(path):
+        return None
+    with open(path) as f:
+        return json.load(f)
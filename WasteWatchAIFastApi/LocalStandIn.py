@@ -0,0 +1,269 @@
+"""Local stand-in for Open-Meteo and the WasteWatch backend, for offline benchmarks and tests.
+
+Serves the Open-Meteo archive, forecast and historical-forecast daily APIs plus the
+backend /account/login, /api/TrashItems/trash|dummy (with ?since=) and /api/Weather/ contracts with
+deterministic generated data.
+
+Run it and point the service at it:
+
+    uvicorn LocalStandIn:app --port 8090
+
+    BACKEND_BASE_URL=http://localhost:8090
+    OPEN_METEO_ARCHIVE_URL=http://localhost:8090/v1/archive
+    OPEN_METEO_FORECAST_URL=http://localhost:8090/v1/forecast
+    OPEN_METEO_HISTORICAL_FORECAST_URL=http://localhost:8090/historical-forecast/v1/forecast
+
+Latency, error rate and dataset size come from STANDIN_* environment variables and
+can be changed at runtime with POST /standin/config.
+"""
+import asyncio
+import os
+import random
+import uuid
+from collections import Counter
+from datetime import datetime, timedelta, date
+from typing import Optional
+
+import numpy as np
+from fastapi import FastAPI, Header, HTTPException, Request
+from fastapi.responses import JSONResponse
+
+app = FastAPI(title="WasteWatch local stand-in")
+
+settings = {
+    "latency_ms": float(os.getenv("STANDIN_LATENCY_MS", "0")),
+    "latency_jitter_ms": float(os.getenv("STANDIN_LATENCY_JITTER_MS", "0")),
+    "error_rate": float(os.getenv("STANDIN_ERROR_RATE", "0")),
+    "trash_items": int(os.getenv("STANDIN_TRASH_ITEMS", "5000")),
+    "days": int(os.getenv("STANDIN_DAYS", "365")),
+    "seed": int(os.getenv("STANDIN_SEED", "42"))
+}
+request_counts = Counter()
+
+ACCESS_TOKEN = "standin-token"
+LITTER_TYPES = ['Plastic', 'Papier', 'Organisch', 'Glas']
+LITTER_PROBABILITIES = [0.45, 0.25, 0.20, 0.10]
+
+# Same hotspots as the mock-api data generator
+LOCATIONS = [
+    ((51.5890, 51.5900), (4.7750, 4.7765)),  # Grote Markt
+    ((51.5953, 51.5963), (4.7787, 4.7797)),  # Centraal Station
+    ((51.5929, 51.5939), (4.7791, 4.7801)),  # Valkenberg Park
+    ((51.5920, 51.5925), (4.7685, 4.7695)),  # Havermarkt
+    ((51.5860, 51.5866), (4.7848, 4.7856))   # Wilhelminapark
+]
+
+DAILY_GENERATORS = ['temperature_2m_mean', 'temperature_2m_max', 'temperature_2m_min', 'precipitation_sum', 'weather_code']
+DAILY_UNITS = {
+    'time': 'iso8601', 'temperature_2m_mean': '°C', 'temperature_2m_max': '°C',
+    'temperature_2m_min': '°C', 'precipitation_sum': 'mm', 'weather_code': 'wmo code'
+}
+DESCRIPTIONS = {0: 'Zonnig', 2: 'Gedeeltelijk bewolkt', 3: 'Bewolkt', 61: 'Regenachtig', 63: 'Regenachtig', 45: 'Mistig'}
+
+_dataset = None
+
+
+# Open-Meteo
+
+def generate_day(latitude: float, longitude: float, day: date):
+    """Deterministic daily weather for a location and day"""
+    rng = random.Random(f"{latitude:.2f}:{longitude:.2f}:{day.isoformat()}")
+    mean = 10.5 + 7.5 * np.sin((day.timetuple().tm_yday - 110) * 2 * np.pi / 365) + rng.gauss(0, 2.5)
+    spread = rng.uniform(3, 9)
+    precipitation = round(rng.expovariate(1 / 6), 1) if rng.random() < 0.45 else 0.0
+    if precipitation > 4:
+        code = 63 if precipitation > 10 else 61
+    elif precipitation > 0:
+        code = 3
+    else:
+        code = rng.choice([0, 0, 2, 3, 45])
+    return {
+        'temperature_2m_mean': round(mean, 1),
+        'temperature_2m_max': round(mean + spread / 2, 1),
+        'temperature_2m_min': round(mean - spread / 2, 1),
+        'precipitation_sum': precipitation,
+        'weather_code': code
+    }
+
+
+def daily_response(latitude: float, longitude: float, start: date, end: date, daily: str):
+    variables = [variable for variable in daily.split(',') if variable]
+    unknown = [variable for variable in variables if variable not in DAILY_GENERATORS]
+    if unknown:
+        raise HTTPException(status_code=400, detail={"error": True, "reason": f"Cannot initialize WeatherVariable from invalid String value {unknown[0]}"})
+    if end < start:
+        raise HTTPException(status_code=400, detail={"error": True, "reason": "End-date must be larger or equals than start-date"})
+
+    days = [start + timedelta(days=i) for i in range((end - start).days + 1)]
+    generated = [generate_day(latitude, longitude, day) for day in days]
+    return {
+        'latitude': latitude,
+        'longitude': longitude,
+        'generationtime_ms': 0.1,
+        'utc_offset_seconds': 0,
+        'timezone': 'Europe/Amsterdam',
+        'daily_units': {variable: DAILY_UNITS[variable] for variable in ['time'] + variables},
+        'daily': {
+            'time': [day.isoformat() for day in days],
+            **{variable: [values[variable] for values in generated] for variable in variables}
+        }
+    }
+
+
+def _parse_date(value: str, name: str):
+    try:
+        return datetime.strptime(value, '%Y-%m-%d').date()
+    except (TypeError, ValueError):
+        raise HTTPException(status_code=400, detail={"error": True, "reason": f"Invalid date format for {name}"})
+
+
+@app.get("/v1/archive")
+def archive(latitude: float, longitude: float, start_date: str, end_date: str, daily: str = ""):
+    start = _parse_date(start_date, 'start_date')
+    end = _parse_date(end_date, 'end_date')
+    if end > datetime.now().date():
+        raise HTTPException(status_code=400, detail={"error": True, "reason": "Parameter 'end_date' is out of allowed range"})
+    return daily_response(latitude, longitude, start, end, daily)
+
+
+@app.get("/v1/forecast")
+@app.get("/historical-forecast/v1/forecast")
+def forecast(latitude: float, longitude: float, daily: str = "", start_date: Optional[str] = None,
+             end_date: Optional[str] = None, past_days: int = 0, forecast_days: int = 7):
+    today = datetime.now().date()
+    if start_date and end_date:
+        start = _parse_date(start_date, 'start_date')
+        end = _parse_date(end_date, 'end_date')
+    else:
+        start = today - timedelta(days=past_days)
+        end = today + timedelta(days=forecast_days - 1)
+    if end > today + timedelta(days=15) or start < today - timedelta(days=92):
+        raise HTTPException(status_code=400, detail={"error": True, "reason": "Parameter 'start_date' is out of allowed range"})
+    return daily_response(latitude, longitude, start, end, daily)
+
+
+# WasteWatch backend
+
+def generate_dataset():
+    """Trash items and daily weather records for the last `days` days"""
+    rng = np.random.default_rng(settings["seed"])
+    today = datetime.now().date()
+    days = [today - timedelta(days=i) for i in range(settings["days"], 0, -1)]
+    weather = [generate_day(51.59, 4.78, day) for day in days]
+
+    # More litter on warm, dry weekend days
+    weights = np.array([
+        (1.0 + max(0.0, values['temperature_2m_mean'] - 5) / 15)
+        * (1.4 if day.weekday() >= 5 else 1.0)
+        * (0.6 if values['precipitation_sum'] > 4 else 1.0)
+        for day, values in zip(days, weather)
+    ])
+    per_day = rng.multinomial(settings["trash_items"], weights / weights.sum())
+
+    items = []
+    for day, count in zip(days, per_day):
+        midnight = datetime.combine(day, datetime.min.time())
+        seconds = np.sort(rng.integers(0, 86400, size=count))
+        types = rng.choice(len(LITTER_TYPES), size=count, p=LITTER_PROBABILITIES)
+        spots = rng.integers(0, len(LOCATIONS), size=count)
+        for second, litter_type, spot in zip(seconds, types, spots):
+            (lat_min, lat_max), (lon_min, lon_max) = LOCATIONS[spot]
+            items.append({
+                'id': str(uuid.UUID(bytes=rng.bytes(16), version=4)),
+                'litterType': LITTER_TYPES[litter_type],
+                'latitude': round(float(rng.uniform(lat_min, lat_max)), 6),
+                'longitude': round(float(rng.uniform(lon_min, lon_max)), 6),
+                'timestamp': (midnight + timedelta(seconds=int(second))).strftime('%Y-%m-%dT%H:%M:%S.%f')[:-3]
+            })
+
+    weather_records = [{
+        'id': str(uuid.UUID(bytes=rng.bytes(16), version=4)),
+        'timestamp': f"{day.isoformat()}T12:00:00",
+        'latitude': 51.59,
+        'longitude': 4.78,
+        'temperature': values['temperature_2m_mean'],
+        'weatherDescription': DESCRIPTIONS.get(values['weather_code'], 'Bewolkt')
+    } for day, values in zip(days, weather)]
+
+    return {'trash': items, 'weather': weather_records}
+
+
+def get_dataset():
+    global _dataset
+    if _dataset is None:
+        _dataset = generate_dataset()
+    return _dataset
+
+
+def _require_token(authorization: Optional[str]):
+    if authorization != f"Bearer {ACCESS_TOKEN}":
+        raise HTTPException(status_code=401, detail="Unauthorized")
+
+
+@app.post("/account/login")
+def login(credentials: dict):
+    if not credentials.get("email"):
+        raise HTTPException(status_code=401, detail="Invalid credentials")
+    return {"tokenType": "Bearer", "accessToken": ACCESS_TOKEN, "expiresIn": 3600, "refreshToken": "standin-refresh"}
+
+
+@app.get("/api/TrashItems/trash")
+@app.get("/api/TrashItems/dummy")
+def trash_items(authorization: Optional[str] = Header(None), since: Optional[str] = None):
+    _require_token(authorization)
+    items = get_dataset()['trash']
+    if since:
+        # Same contract as the backend: items with a timestamp at or after `since`
+        cutoff = _parse_since(since).strftime('%Y-%m-%dT%H:%M:%S.%f')[:-3]
+        items = [item for item in items if item['timestamp'] >= cutoff]
+    return items
+
+
+def _parse_since(value: str):
+    try:
+        return datetime.fromisoformat(value)
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid since timestamp")
+
+
+@app.get("/api/Weather/")
+@app.get("/api/Weather")
+def weather_records(authorization: Optional[str] = Header(None)):
+    _require_token(authorization)
+    return get_dataset()['weather']
+
+
+# Stand-in control
+
+@app.middleware("http")
+async def inject_latency_and_errors(request: Request, call_next):
+    path = request.url.path
+    if path.startswith("/standin"):
+        return await call_next(request)
+
+    request_counts[path] += 1
+    latency = settings["latency_ms"] + random.uniform(0, settings["latency_jitter_ms"])
+    if latency > 0:
+        await asyncio.sleep(latency / 1000)
+    if settings["error_rate"] > 0 and random.random() < settings["error_rate"]:
+        return JSONResponse(status_code=503, content={"error": True, "reason": "Injected stand-in error"})
+    return await call_next(request)
+
+
+@app.get("/standin/config")
+def get_config():
+    return {"settings": settings, "request_counts": dict(request_counts)}
+
+
+@app.post("/standin/config")
+def update_config(update: dict):
+    global _dataset
+    unknown = [key for key in update if key not in settings]
+    if unknown:
+        raise HTTPException(status_code=400, detail=f"Unknown settings: {unknown}")
+    for key, value in update.items():
+        settings[key] = type(settings[key])(value)
+    if {"trash_items", "days", "seed"} & set(update):
+        _dataset = None
+    request_counts.clear()
+    return get_config()
@@ -0,0 +1,101 @@
+import itertools
+import threading
+from datetime import datetime
+from types import MappingProxyType
+
+_versions = itertools.count(1)
+
+
+class ModelSnapshot:
+    """Immutable, versioned set of trained models with their scores and feature layout.
+
+    Prediction code takes one snapshot at the start of a request and uses only that,
+    so a reload can never expose a half-updated model set.
+    """
+
+    __slots__ = ('version', 'created_at', 'source', 'fingerprint', 'dt_models', 'rf_models',
+                 'dt_r2_scores', 'rf_r2_scores', 'features', 'weather_mapping', 'fit_times', 'output_columns',
+                 'data_stats')
+
+    def __init__(self, dt_models, rf_models, dt_r2_scores, rf_r2_scores, features, weather_mapping,
+                 fit_times=None, output_columns=None, fingerprint=None, source='trained', data_stats=None):
+        values = {
+            'version': next(_versions),
+            'created_at': datetime.now(),
+            'source': source,
+            'fingerprint': fingerprint,
+            'dt_models': MappingProxyType(dict(dt_models)),
+            'rf_models': MappingProxyType(dict(rf_models)),
+            'dt_r2_scores': MappingProxyType(dict(dt_r2_scores)),
+            'rf_r2_scores': MappingProxyType(dict(rf_r2_scores)),
+            'features': tuple(features),
+            'weather_mapping': MappingProxyType(dict(weather_mapping)),
+            'fit_times': MappingProxyType(dict(fit_times or {})),
+            'output_columns': MappingProxyType(dict(output_columns or {})),
+            # Training window statistics, the baseline for drift detection
+            'data_stats': MappingProxyType(dict(data_stats or {}))
+        }
+        for name, value in values.items():
+            object.__setattr__(self, name, value)
+
+    def __setattr__(self, name, value):
+        raise AttributeError("ModelSnapshot is immutable, publish a new snapshot instead")
+
+    def __bool__(self):
+        return bool(self.dt_models or self.rf_models)
+
+    @classmethod
+    def from_artifact(cls, artifact, source='artifact'):
+        return cls(
+            artifact['dt_models'], artifact['rf_models'], artifact['dt_r2_scores'], artifact['rf_r2_scores'],
+            artifact['features'], artifact['weather_mapping'], artifact.get('fit_times'),
+            artifact.get('output_columns'), artifact.get('fingerprint'), source, artifact.get('data_stats')
+        )
+
+    def to_artifact(self):
+        """Plain dicts for the ModelStore (mapping proxies cannot be pickled)"""
+        return {
+            'dt_models': dict(self.dt_models),
+            'rf_models': dict(self.rf_models),
+            'dt_r2_scores': dict(self.dt_r2_scores),
+            'rf_r2_scores': dict(self.rf_r2_scores),
+            'features': list(self.features),
+            'weather_mapping': dict(self.weather_mapping),
+            'fit_times': dict(self.fit_times),
+            'output_columns': dict(self.output_columns),
+            'data_stats': dict(self.data_stats)
+        }
+
+    def info(self):
+        return {
+            'version': self.version,
+            'created_at': self.created_at.isoformat(),
+            'source': self.source,
+            'fingerprint': self.fingerprint[:12] if self.fingerprint else None,
+            'models': len(self.dt_models) + len(self.rf_models),
+            'fit_seconds': dict(self.fit_times)
+        }
+
+
+EMPTY_SNAPSHOT = ModelSnapshot({}, {}, {}, {}, [], {}, source='empty')
+
+
+class SnapshotHolder:
+    """Holds the current snapshot of one model set; publish() swaps it in a single reference assignment"""
+
+    def __init__(self, name: str):
+        self.name = name
+        self._current = EMPTY_SNAPSHOT
+        self._lock = threading.Lock()
+
+    @property
+    def current(self) -> ModelSnapshot:
+        return self._current
+
+    def publish(self, snapshot: ModelSnapshot):
+        with self._lock:
+            previous = self._current
+            self._current = snapshot
+        print(f"🔁 Models '{self.name}': published version {snapshot.version} ({snapshot.source}), "
+              f"replacing version {previous.version}")
+        return previous
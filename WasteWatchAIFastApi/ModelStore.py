@@ -0,0 +1,74 @@
+import hashlib
+import json
+import os
+import pickle
+import tempfile
+from datetime import datetime
+
+import sklearn
+
+import Config
+from TrashStore import records_digest
+from FeatureStore import FEATURE_VERSION
+
+
+def data_fingerprint(trash_digest: str, weather_data):
+    """Hash of the training data: the trash store digest plus the weather records.
+
+    Both digests are independent of the order the backend returns records in.
+    """
+    digest = hashlib.sha256()
+    digest.update(f"features={FEATURE_VERSION};sklearn={sklearn.__version__};mode={Config.MODEL_MODE}".encode())
+    digest.update(f";params={json.dumps(Config.MODEL_PARAMS, sort_keys=True)}".encode())
+    digest.update(f";trash={trash_digest};weather={records_digest(weather_data)}".encode())
+    return digest.hexdigest()
+
+
+class ModelStore:
+    """Pickled model artifacts on disk, one file per model set ("trash", "dummy").
+
+    An artifact holds the trained models, R² scores and feature list together with
+    the fingerprint of the data they were trained on.
+    """
+
+    def __init__(self, directory: str):
+        self.directory = directory
+
+    def path(self, name: str):
+        return os.path.join(self.directory, f"{name}_models.pkl")
+
+    def load(self, name: str, fingerprint: str):
+        """Return the artifact for `name` if it was trained on data with this fingerprint"""
+        path = self.path(name)
+        if not os.path.exists(path):
+            return None
+        try:
+            with open(path, 'rb') as f:
+                artifact = pickle.load(f)
+        except Exception as e:
+            print(f"⚠️  Could not read model artifact {path}: {e}")
+            return None
+
+        if artifact.get('fingerprint') != fingerprint:
+            print(f"🔄 Training data changed since artifact '{name}' was saved")
+            return None
+        return artifact
+
+    def save(self, name: str, fingerprint: str, artifact: dict):
+        """Write the artifact atomically so a crash never leaves a half-written file"""
+        os.makedirs(self.directory, exist_ok=True)
+        artifact = {**artifact, 'fingerprint': fingerprint, 'saved_at': datetime.now().isoformat()}
+
+        fd, tmp_path = tempfile.mkstemp(dir=self.directory, suffix='.tmp')
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                pickle.dump(artifact, f, protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(tmp_path, self.path(name))
+        except Exception:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
+        print(f"💾 Saved model artifact '{name}' ({fingerprint[:12]})")
+
+
+model_store = ModelStore(Config.MODEL_STORE_DIR)
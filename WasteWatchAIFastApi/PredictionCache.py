@@ -0,0 +1,82 @@
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Hashable, Optional
+
+
+class PredictionCache:
+    """Bounded LRU of prediction results for one model set, keyed on the model snapshot version plus normalized inputs.
+
+    A result can only change when the models or the weather change. Publishing new models gives a
+    new snapshot version, and the first lookup with that version drops every older entry. Results
+    based on forecast weather expire after `ttl`, like the weather cache they were built from.
+    """
+
+    def __init__(self, name: str, max_entries: int = 10000):
+        self.name = name
+        self.max_entries = max_entries
+        self.version = None
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.invalidations = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def _current(self, version: int) -> bool:
+        """Move to a newer model version; False for a version older than the cached one"""
+        if self.version is not None and version < self.version:
+            return False
+        if version != self.version:
+            if self._entries:
+                self.invalidations += 1
+                print(f"🧹 Prediction cache '{self.name}': dropped {len(self._entries)} entries of "
+                      f"model version {self.version}")
+            self._entries.clear()
+            self.version = version
+        return True
+
+    def get(self, version: int, key: Hashable) -> Optional[Any]:
+        """Cached result, or None on a miss"""
+        with self._lock:
+            entry = self._entries.get(key) if self._current(version) else None
+            if entry is not None and entry[1] is not None and entry[1] <= time.time():
+                del self._entries[key]
+                entry = None
+            if entry is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[0]
+
+    def put(self, version: int, key: Hashable, value: Any, ttl: Optional[float] = None):
+        if self.max_entries <= 0:
+            return
+        with self._lock:
+            if not self._current(version):
+                return
+            self._entries[key] = (value, None if ttl is None else time.time() + ttl)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self):
+        with self._lock:
+            entries = len(self._entries)
+        lookups = self.hits + self.misses
+        return {
+            'entries': entries,
+            'max_entries': self.max_entries,
+            'model_version': self.version,
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_rate': round(self.hits / lookups, 4) if lookups else None,
+            'evictions': self.evictions,
+            'invalidations': self.invalidations
+        }
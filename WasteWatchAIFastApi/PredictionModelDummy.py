@@ -7,153 +7,139 @@ import numpy as np
 import pickle
 import os
 from datetime import datetime, timedelta
-from typing import Dict, Any
+from typing import Dict, Any, List
 from sklearn.ensemble import RandomForestRegressor
 from sklearn.tree import DecisionTreeRegressor
 from sklearn.model_selection import train_test_split
 from sklearn.metrics import r2_score
-import requests
 import warnings
 from fastapi import APIRouter
-import time
+import asyncio
+from BackendClient import fetch_training_data
+from WeatherClient import weather_client
+from SingleFlight import SingleFlight
+from TrainingEngine import train_all, ensemble_outputs
+from ConfidenceEngine import tree_outputs, consensus_confidence
+from PredictionCache import PredictionCache
+from BatchPrediction import handle_batch, handle_forecast, handle_heatmap
+from BatchPrediction import PredictionRequest, PredictionResponse, BatchPredictionRequest, BatchPredictionResponse
+from BatchPrediction import ForecastRequest, ForecastResponse, HeatmapRequest, HeatmapResponse
+from TrainingWorker import get_status, require_ready
+from ModelStore import model_store, data_fingerprint
+from ModelSnapshot import ModelSnapshot, SnapshotHolder
+from TrashStore import trash_store_for
+from FeatureStore import FEATURES, TARGETS, feature_store_for, feature_table, feature_vector
+from DriftMonitor import DriftSource, training_window_stats
+from HyperparameterSearch import successive_halving, save_results
+import Config
+from WeatherEncoding import WEATHER_FEATURES, describe_code
 
 router = APIRouter()
 
 # Suppress the specific sklearn warning
 warnings.filterwarnings("ignore", message="X has feature names, but DecisionTreeRegressor was fitted without feature names")
 
-# Global variables voor models
-dt_models = {}
-rf_models = {}
-dt_r2_scores = {}
-rf_r2_scores = {}
-available_features = []
-weather_mapping = {}
-jwt_token = None
+# Current model set: one immutable ModelSnapshot, replaced atomically on (re)load
+models = SnapshotHolder("dummy")
+prediction_flights = SingleFlight("prediction")
+prediction_cache = PredictionCache("dummy", Config.PREDICTION_CACHE_MAX_ENTRIES)
+model_status = get_status("dummy")
+trash_store = trash_store_for("dummy")
+feature_store = feature_store_for("dummy")
 
-class PredictionRequest(BaseModel):
-    date: str 
-    latitude: float = 51.5890  # Default voor Breda centrum
-    longitude: float = 4.7750  # Default voor Breda centrum
-
-class PredictionResponse(BaseModel):
-    date: str 
-    latitude: float
-    longitude: float
-    temperature: float 
-    weather_description: str 
-    weather_source: str
-    predictions: Dict[str, int]
-    confidence_scores: Dict[str, float]
-    model_used_per_category: Dict[str, str] = {}
-    data_source: str
+async def get_weather_from_openmeteo(date_str: str, latitude: float, longitude: float):
+    """Get weather data from OpenMeteo API for specific date and location"""
+    try:
+        # Per-day lookup served from a month or forecast-window block
+        data = await weather_client.get_day(date_str, latitude, longitude)
+    except Exception as e:
+        data = e
+    return weather_from_daily(data, date_str)
 
+async def get_weather_range(start_date: str, days: int, latitude: float, longitude: float):
+    """Weather for consecutive days from one range lookup (one upstream call for the forecast window)"""
+    payloads = await weather_client.get_range(start_date, days, latitude, longitude)
+    start = datetime.strptime(start_date, '%Y-%m-%d').date()
+    return [weather_from_daily(payload, (start + timedelta(days=offset)).isoformat())
+            for offset, payload in enumerate(payloads)]
 
-def get_weather_from_openmeteo(date_str: str, latitude: float, longitude: float):
-    """Get weather data from OpenMeteo API for specific date and location"""
+def weather_from_daily(data, date_str: str):
+    """Temperature and description from a one-day OpenMeteo payload (or the error fetching it), with fallbacks"""
     try:
-        # Parse date
-        target_date = datetime.strptime(date_str, '%Y-%m-%d').date()
-        today = datetime.now().date()
-        
-        # Determine if historical data or forecast
-        if target_date <= today:
-            # Historical data
-            api_url = "https://archive-api.open-meteo.com/v1/archive"
-            temp_params = 'temperature_2m_mean,temperature_2m_max,temperature_2m_min'
-        else:
-            # Forecast data - use more parameters
-            api_url = "https://api.open-meteo.com/v1/forecast"
-            temp_params = 'temperature_2m_max,temperature_2m_min,temperature_2m_mean'
+        if isinstance(data, Exception):
+            raise data
         
-        # API parameters - request multiple temperature types
-        params = {
-            'latitude': latitude,
-            'longitude': longitude,
-            'start_date': date_str,
-            'end_date': date_str,
-            'daily': f'{temp_params},weather_code',
-            'timezone': 'Europe/Amsterdam'
-        }
-        
-        print(f"🌤️ Fetching weather for {date_str} from OpenMeteo...")
-        response = requests.get(api_url, params=params, timeout=10)
-        
-        if response.status_code == 200:
-            data = response.json()
-            print(f"🔍 OpenMeteo response: {data}")
+        if 'daily' in data and data['daily']['time']:
+            daily_data = data['daily']
+            
+            # Try different temperature sources
+            temperature = None
+            temp_source = None
             
-            if 'daily' in data and data['daily']['time']:
-                daily_data = data['daily']
+            # 1. Try temperature_2m_mean
+            if 'temperature_2m_mean' in daily_data and daily_data['temperature_2m_mean']:
+                temp_val = daily_data['temperature_2m_mean'][0]
+                if temp_val is not None:
+                    temperature = temp_val
+                    temp_source = "mean"
+            
+            # 2. If mean doesn't work, calculate from max/min
+            if temperature is None:
+                temp_max = None
+                temp_min = None
                 
-                # Try different temperature sources
-                temperature = None
-                temp_source = None
+                if 'temperature_2m_max' in daily_data and daily_data['temperature_2m_max']:
+                    temp_max = daily_data['temperature_2m_max'][0]
                 
-                # 1. Try temperature_2m_mean
-                if 'temperature_2m_mean' in daily_data and daily_data['temperature_2m_mean']:
-                    temp_val = daily_data['temperature_2m_mean'][0]
-                    if temp_val is not None:
-                        temperature = temp_val
-                        temp_source = "mean"
+                if 'temperature_2m_min' in daily_data and daily_data['temperature_2m_min']:
+                    temp_min = daily_data['temperature_2m_min'][0]
                 
-                # 2. If mean doesn't work, calculate from max/min
-                if temperature is None:
-                    temp_max = None
-                    temp_min = None
-                    
-                    if 'temperature_2m_max' in daily_data and daily_data['temperature_2m_max']:
-                        temp_max = daily_data['temperature_2m_max'][0]
-                    
-                    if 'temperature_2m_min' in daily_data and daily_data['temperature_2m_min']:
-                        temp_min = daily_data['temperature_2m_min'][0]
-                    
-                    if temp_max is not None and temp_min is not None:
-                        temperature = (temp_max + temp_min) / 2
-                        temp_source = f"calculated from max({temp_max}°C) and min({temp_min}°C)"
-                    elif temp_max is not None:
-                        temperature = temp_max - 3  # Estimate: max - 3°C for average
-                        temp_source = f"estimated from max({temp_max}°C)"
-                    elif temp_min is not None:
-                        temperature = temp_min + 3  # Estimate: min + 3°C for average
-                        temp_source = f"estimated from min({temp_min}°C)"
+                if temp_max is not None and temp_min is not None:
+                    temperature = (temp_max + temp_min) / 2
+                    temp_source = f"calculated from max({temp_max}°C) and min({temp_min}°C)"
+                elif temp_max is not None:
+                    temperature = temp_max - 3  # Estimate: max - 3°C for average
+                    temp_source = f"estimated from max({temp_max}°C)"
+                elif temp_min is not None:
+                    temperature = temp_min + 3  # Estimate: min + 3°C for average
+                    temp_source = f"estimated from min({temp_min}°C)"
+            
+            # 3. Get weather code
+            weather_code = daily_data.get('weather_code', [None])[0] if daily_data.get('weather_code') else None
+            
+            # 4. If we have temperature, use it
+            if temperature is not None and isinstance(temperature, (int, float)) and -50 <= temperature <= 60:
+                weather_description = map_weather_code_to_description(weather_code) if weather_code is not None else 'Bewolkt'
                 
-                # 3. Get weather code
-                weather_code = daily_data.get('weather_code', [None])[0] if daily_data.get('weather_code') else None
+                print(f"✅ Weather data: {temperature}°C ({temp_source}), {weather_description}")
                 
-                # 4. If we have temperature, use it
-                if temperature is not None and isinstance(temperature, (int, float)) and -50 <= temperature <= 60:
-                    weather_description = map_weather_code_to_description(weather_code) if weather_code is not None else 'Cloudy'
-                    
-                    print(f"✅ Weather data: {temperature}°C ({temp_source}), {weather_description}")
-                    
-                    return {
-                        'temperature': round(float(temperature), 1),
-                        'weather_description': weather_description,
-                        'weather_source': f'OpenMeteo API ({temp_source})'
-                    }
+                return {
+                    'temperature': round(float(temperature), 1),
+                    'weather_description': weather_description,
+                    'weather_source': f'OpenMeteo API ({temp_source})',
+                    # Complete archive data that will not change anymore
+                    'final': bool(data.get('final'))
+                }
+            
+            # 5. If only weather code available
+            elif weather_code is not None:
+                # Use seasonal average + weather code
+                month = datetime.strptime(date_str, '%Y-%m-%d').month
+                seasonal_temp = get_seasonal_temperature(month)
+                weather_description = map_weather_code_to_description(weather_code)
                 
-                # 5. If only weather code available
-                elif weather_code is not None:
-                    # Use seasonal average + weather code
-                    month = datetime.strptime(date_str, '%Y-%m-%d').month
-                    seasonal_temp = get_seasonal_temperature(month)
-                    weather_description = map_weather_code_to_description(weather_code)
-                    
-                    print(f"✅ Partial weather data: {seasonal_temp}°C (seasonal), {weather_description} (OpenMeteo)")
-                    
-                    return {
-                        'temperature': seasonal_temp,
-                        'weather_description': weather_description,
-                        'weather_source': 'OpenMeteo weather + seasonal temperature'
-                    }
+                print(f"✅ Partial weather data: {seasonal_temp}°C (seasonal), {weather_description} (OpenMeteo)")
                 
-                else:
-                    raise Exception(f"No valid temperature or weather data: temp={temperature}, code={weather_code}")
+                return {
+                    'temperature': seasonal_temp,
+                    'weather_description': weather_description,
+                    'weather_source': 'OpenMeteo weather + seasonal temperature'
+                }
+            
             else:
-                raise Exception(f"Invalid OpenMeteo response structure: {data}")
+                raise Exception(f"No valid temperature or weather data: temp={temperature}, code={weather_code}")
         else:
-            raise Exception(f"OpenMeteo API returned status {response.status_code}: {response.text}")
+            raise Exception(f"Invalid OpenMeteo response structure: {data}")
             
     except Exception as e:
         print(f"❌ OpenMeteo API failed: {e}")
@@ -173,38 +159,7 @@ def get_weather_from_openmeteo(date_str: str, latitude: float, longitude: float)
 
 def map_weather_code_to_description(weather_code):
     """Map OpenMeteo weather codes to Dutch descriptions"""
-    weather_code_mapping = {
-        0: 'Zonnig',
-        1: 'Gedeeltelijk bewolkt',
-        2: 'Gedeeltelijk bewolkt', 
-        3: 'Bewolkt',
-        45: 'Mistig',
-        48: 'Mistig',
-        51: 'Lichte motregen',
-        53: 'Motregen',
-        55: 'Motregen',
-        56: 'IJzel',
-        57: 'IJzel',
-        61: 'Lichte regen',
-        63: 'Regen',
-        65: 'Zware regen',
-        66: 'IJzel',
-        67: 'IJzel',
-        71: 'Lichte sneeuw',
-        73: 'Sneeuw',
-        75: 'Zware sneeuw',
-        77: 'Hagel',
-        80: 'Lichte buien',
-        81: 'Buien',
-        82: 'Zware buien',
-        85: 'Sneeuwbuien',
-        86: 'Sneeuwbuien',
-        95: 'Onweer',
-        96: 'Onweer met hagel',
-        99: 'Zwaar onweer'
-    }
-    
-    return weather_code_mapping.get(weather_code, 'Bewolkt')
+    return describe_code(weather_code)
 
 def get_seasonal_weather(month):
     """Get typical weather for season in Netherlands (Dutch descriptions)"""
@@ -228,285 +183,102 @@ def get_seasonal_temperature(month):
     else:  # Autumn (9, 10, 11)
         return 12.0
 
-def read_password():
-    try:
-        with open('password.txt', 'r') as file:
-            content = file.read().strip()
-            # Parse the password=value format
-            if '=' in content:
-                return content.split('=')[1]
-            return content
-    except FileNotFoundError:
-        print("⚠️  password.txt file not found")
-        return None
-    except Exception as e:
-        print(f"⚠️  Error reading password file: {e}")
-        return None
-    
-
-def load_data_and_train_models():
+async def load_data_and_train_models():
     """Load dummy data and train both Decision Tree and Random Forest models with retry logic"""
-    global dt_models, rf_models, dt_r2_scores, rf_r2_scores, available_features, weather_mapping
-    
-    # Container startup retry configuration
-    max_retries = 60  # Increased for container startup
-    retry_delay = 10  # Longer delay for container startup
-    
-    base_url = "http://host.docker.internal:8080"  # Since this URL works 
-    login_url = f"{base_url}/account/login"
-
-    password = read_password()
-
-    login_credentials = {
-        "email": "serviceaccount@example.com",
-        "password": password
-    }
-    
-    working_base_url = None
-    trash_data = None
-    weather_data = None
-    
-    print(f"⏳ Waiting for API container to start at {base_url} (DUMMY)")
-    print(f"🔄 Will retry {max_retries} times with {retry_delay}s intervals (max {max_retries * retry_delay / 60:.1f} minutes)")
+    ingested = await ingest_new_data()
+    if ingested is None:
+        return False
+    _, weather_data = ingested
     
-    # Keep trying until the API container is ready
-    for attempt in range(1, max_retries + 1):
+    # Warm start: reuse the stored models when the training data did not change
+    fingerprint = data_fingerprint(trash_store.content_digest(), weather_data)
+    if models.current.fingerprint == fingerprint:
+        print(f"✅ Training data unchanged, keeping model version {models.current.version}")
+        return True
+    artifact = model_store.load("dummy", fingerprint)
+    if artifact is not None:
+        snapshot = ModelSnapshot.from_artifact(artifact)
+        print(f"⚡ Loaded {len(snapshot.dt_models)} models from artifact store ({fingerprint[:12]})")
+    else:
+        # Training is CPU-bound, keep it off the event loop
+        features = await asyncio.to_thread(feature_store.table, trash_store.daily_data(), weather_data)
+        snapshot = await asyncio.to_thread(train_models, features, weather_data, fingerprint)
+        if not snapshot:
+            return False
         try:
-            print(f"🎲 Dummy API check {attempt}/{max_retries} ({attempt * retry_delay}s elapsed)")
-
-            # 1. Login to get JWT token
-            print(f"   🔐 Attempting login at {login_url}")
-            login_response = requests.post(login_url, json=login_credentials, timeout=15)
-            print(f"   🔐 Login response: {login_response.status_code} - {login_response.text}")
-            if login_response.status_code != 200:
-                print(f"   ❌ Login failed with status {login_response.status_code}: {login_response.text}")
-                raise Exception("Login failed")
+            model_store.save("dummy", fingerprint, snapshot.to_artifact())
+        except Exception as e:
+            print(f"⚠️  Could not save model artifact: {e}")
+    
+    # In-flight predictions keep the snapshot they started with
+    publish(snapshot)
+    return True
 
-            
-            jwt_token = login_response.json().get("accessToken")
-            print(f"   🔑 JWT token received: {jwt_token}... (truncated for security)")
-            if not jwt_token:
-                print(f"   ❌ No token received from login")
-                raise Exception("Token not received")
+async def ingest_new_data(**fetch_options):
+    """Download trash items newer than the local store's watermark and merge them.
 
-            headers = {
-                "Authorization": f"Bearer {jwt_token}"
-            }
+    Returns (added, weather_data), or None when the backend never became ready.
+    """
+    trash_data, weather_data = await fetch_training_data("dummy", "DUMMY", since=trash_store.since(),
+                                                         **fetch_options)
+    if trash_data is None:
+        return None
+    added = await asyncio.to_thread(trash_store.merge, trash_data)
+    if added:
+        await asyncio.to_thread(trash_store.save)
+    print(f"📥 {added} new trash items, {len(trash_store)} in local store (watermark {trash_store.watermark})")
+    return added, weather_data
 
-            # 2. Call dummy API with Authorization header
-            trash_url = f"{base_url}/api/TrashItems/dummy"
-            print(f"   📡 Testing dummy API: {trash_url} with JWT")
+async def tune_models(budget_seconds: float = Config.TUNING_BUDGET_SECONDS):
+    """Budgeted hyperparameter search on the current feature table; persists the Pareto front"""
+    ingested = await ingest_new_data(max_retries=1, retry_delay=0)
+    if ingested is None:
+        return None
+    features = await asyncio.to_thread(feature_store.table, trash_store.daily_data(), ingested[1])
+    results = await asyncio.to_thread(successive_halving, features, FEATURES, TARGETS, "dummy", budget_seconds)
+    save_results("dummy", results)
+    return results
 
-            response = requests.get(trash_url, headers=headers, timeout=15)
-            if response.status_code == 200:
-                trash_data = response.json()
-                working_base_url = base_url  # Set working URL when successful
-                print(f"🎉 SUCCESS! Dummy API container is ready!")
-                print(f"✅ Loaded {len(trash_data)} dummy trash records")
-                break
-            else:
-                print(f"   ⚠️ Dummy API returned {response.status_code}: {response.text}")
+def publish(snapshot):
+    """Make a snapshot the current model set in one atomic swap"""
+    models.publish(snapshot)
+    model_status.training = snapshot.info()
 
-        except Exception as e:
-            print(f"   ⚠️ Attempt failed: {e}")
-            time.sleep(retry_delay)
+# Scheduled drift checks ingest through this module and compare against the published snapshot
+drift_source = DriftSource("dummy", ingest_new_data, trash_store, models)
 
-    if trash_data is None:
-        print("❌ Failed to connect to API after all retries")
-        return False
-    
-    # If we got trash data, try to get weather data
-    if working_base_url and trash_data:
-        try:
-            headers = {
-                "Authorization": f"Bearer {jwt_token}"
-            }
+def train_models(trash_data, weather_data, fingerprint=None):
+    """Train both Decision Tree and Random Forest models on dummy API data
 
-            weather_url = f"{working_base_url}/api/Weather/"
-            print(f"🌤️ Getting dummy weather data: {weather_url}")
-            
-            weather_response = requests.get(weather_url, headers=headers, timeout=15)
-            
-            if weather_response.status_code == 200:
-                weather_data = weather_response.json()
-                print(f"✅ Dummy weather data loaded! {len(weather_data)} records")
-            else:
-                print(f"⚠️  Weather API returned status {weather_response.status_code}")
-                print("⚠️  Continuing with dummy trash data only")
-                
-        except Exception as e:
-            print(f"⚠️  Weather API error: {e}")
-            print("⚠️  Continuing with dummy trash data only")
+    trash_data is trash items (typed columns or records) or the daily rows from the TrashStore.
+    Returns a new ModelSnapshot (not yet published), or False when training failed.
+    """
     
     # Process the data (only real API data, no fallback)
     try:
-        if not trash_data:
+        if trash_data is None or len(trash_data) == 0:
             print("❌ No dummy data available - API container not responding")
             return False
         
-        print("📊 Processing REAL dummy API data...")
-        trash = pd.DataFrame(trash_data)
-        
-        # Debug: print columns and first few rows
-        print(f"🔍 Trash data columns: {list(trash.columns)}")
-        print(f"🔍 Trash data shape: {trash.shape}")
-        if len(trash) > 0:
-            print(f"🔍 First trash record: {trash.iloc[0].to_dict()}")
-        
-        # Process weather data
-        if weather_data:
-            print("🌤️ Processing REAL weather data...")
-            weather_df = pd.DataFrame(weather_data)
-            print(f"🔍 Weather data columns: {list(weather_df.columns)}")
-            print(f"🔍 Weather data shape: {weather_df.shape}")
-            if len(weather_df) > 0:
-                print(f"🔍 First weather record: {weather_df.iloc[0].to_dict()}")
-        else:
-            print("🌤️ No weather data available")
-            weather_df = pd.DataFrame()  # Empty DataFrame
-        
-        # Continue with existing data processing and model training...
-        print("🚀 Starting dummy model training...")
-        
-        # Convert timestamp to datetime - handle various ISO8601 formats
-        trash['timestamp'] = pd.to_datetime(trash['timestamp'], format='ISO8601')
-        trash['datum'] = trash['timestamp'].dt.date
-        trash['hour'] = trash['timestamp'].dt.hour
-        trash['min'] = trash['timestamp'].dt.minute
-        trash['year'] = trash['timestamp'].dt.year
-        trash['month'] = trash['timestamp'].dt.month
-        trash['day'] = trash['timestamp'].dt.day
-        trash['weekday'] = trash['timestamp'].dt.weekday
-        
-        # Group by date and category
-        daily_summary = trash.groupby(['datum', 'litterType']).size().reset_index(name='count')
-        daily_data = daily_summary.pivot(index='datum', columns='litterType', values='count').fillna(0)
-        daily_data = daily_data.reset_index()
-        
-        # Debug: print daily data structure
-        print(f"🔍 Daily data columns after pivot: {list(daily_data.columns)}")
-        print(f"🔍 Daily data shape: {daily_data.shape}")
-        
-        # Add location data (use mean coordinates)
-        daily_data['latitude'] = trash.groupby('datum')['latitude'].mean().values
-        daily_data['longitude'] = trash.groupby('datum')['longitude'].mean().values
-        
-        # Add date features
-        daily_data['year'] = pd.to_datetime(daily_data['datum']).dt.year
-        daily_data['month'] = pd.to_datetime(daily_data['datum']).dt.month
-        daily_data['day'] = pd.to_datetime(daily_data['datum']).dt.day
-        daily_data['weekday'] = pd.to_datetime(daily_data['datum']).dt.weekday
-        
-        # Merge weather data if available
-        if len(weather_df) > 0:
-            print("🔗 Merging weather data...")
-            try:
-                # Prepare weather data
-                if 'timestamp' in weather_df.columns:
-                    weather_df['datum'] = pd.to_datetime(weather_df['timestamp']).dt.date
-                    weather_df = weather_df.rename(columns={
-                        'temperature': 'temperatuur',
-                        'weatherDescription': 'weersverwachting'
-                    })
-                elif 'Timestamp' in weather_df.columns:
-                    weather_df['datum'] = pd.to_datetime(weather_df['Timestamp']).dt.date
-                    weather_df = weather_df.rename(columns={
-                        'Temperature': 'temperatuur',
-                        'WeatherDescription': 'weersverwachting'
-                    })
-                
-                # Merge weather data
-                daily_data = pd.merge(daily_data, weather_df[['datum', 'temperatuur', 'weersverwachting']], 
-                                   on='datum', how='left')
-                print("✅ Weather data merged successfully")
-            except Exception as e:
-                print(f"⚠️ Weather merge failed: {e}")
-                # Continue without weather data
-        else:
-            print("⚠️ No weather data to merge")
-        
-        # Fill missing weather data with defaults (no fallback generation)
-        if 'temperatuur' not in daily_data.columns:
-            daily_data['temperatuur'] = 15.0
-        else:
-            daily_data['temperatuur'] = daily_data['temperatuur'].fillna(15.0)
-            
-        if 'weersverwachting' not in daily_data.columns:
-            daily_data['weersverwachting'] = 'Bewolkt'
-        else:
-            daily_data['weersverwachting'] = daily_data['weersverwachting'].fillna('Bewolkt')
-        
-        # Add calculated features
-        daily_data['is_weekend'] = (daily_data['weekday'] >= 5).astype(int)
-        daily_data['seizoen'] = daily_data['month'].map({
-            12: 0, 1: 0, 2: 0,
-            3: 1, 4: 1, 5: 1,
-            6: 2, 7: 2, 8: 2,
-            9: 3, 10: 3, 11: 3
-        })
-        
-        # Weather mapping
-        weather_mapping = {
-            'Zonnig': 0, 'Gedeeltelijk bewolkt': 1, 'Bewolkt': 2,
-            'Regenachtig': 3, 'Onweer': 4, 'Sneeuw': 5, 'Mistig': 6, 'Onbekend': 1
-        }
-        
-        daily_data['weer_numeriek'] = daily_data['weersverwachting'].map(weather_mapping).fillna(1)
-        
-        # Define available features
-        available_features = [
-            'latitude', 'longitude', 'year', 'month', 'day', 'weekday',
-            'temperatuur', 'weer_numeriek', 'is_weekend', 'seizoen'
-        ]
-        
-        # Target categories
-        targets = ['Plastic', 'Papier', 'Organisch', 'Glas']
+        print("📊 Processing dummy API data...")
+        # Daily counts with calendar and weather features; the FeatureStore passes a materialized table
+        daily_data = feature_table(trash_data, weather_data)
+        weather_mapping = WEATHER_FEATURES
+        available_features = FEATURES
+        targets = TARGETS
         
         print(f"🎯 Training dummy models for {len(targets)} waste categories...")
         print(f"📊 Using {len(daily_data)} days of dummy data")
         
-        # Train models for each category
-        for target_name in targets:
-            if target_name not in daily_data.columns:
-                print(f"⚠️  Target {target_name} not found in dummy data, skipping")
-                continue
-            
-            target = daily_data[target_name]
-            
-            # Skip if target has no variance
-            if target.std() == 0:
-                print(f"⚠️  Target {target_name} has no variance, skipping")
-                continue
-            
-            # Train-test split
-            X_train, X_test, y_train, y_test = train_test_split(
-                daily_data[available_features].values,
-                target.values,
-                test_size=0.3, random_state=42
-            )
-            
-            # Train Decision Tree
-            dt = DecisionTreeRegressor(max_depth=5, random_state=42)
-            dt.fit(X_train, y_train)
-            dt_pred = dt.predict(X_test)
-            dt_r2 = r2_score(y_test, dt_pred)
-            
-            # Train Random Forest
-            rf = RandomForestRegressor(n_estimators=100, max_depth=8, random_state=42)
-            rf.fit(X_train, y_train)
-            rf_pred = rf.predict(X_test)
-            rf_r2 = r2_score(y_test, rf_pred)
-            
-            # Store models and scores
-            dt_models[target_name] = dt
-            rf_models[target_name] = rf
-            dt_r2_scores[target_name] = max(0, dt_r2)
-            rf_r2_scores[target_name] = max(0, rf_r2)
-            
-            print(f"  ✅ {target_name}: DT R²={dt_r2:.3f}, RF R²={rf_r2:.3f}")
+        # Fit every category x model type combination in parallel
+        dt_models, rf_models, dt_r2_scores, rf_r2_scores, fit_times, output_columns = train_all(
+            daily_data, available_features, targets, "dummy"
+        )
         
         print(f"🎉 Dummy model training completed! Trained {len(dt_models)} models")
-        return True
+        return ModelSnapshot(dt_models, rf_models, dt_r2_scores, rf_r2_scores, available_features,
+                             weather_mapping, fit_times, output_columns, fingerprint,
+                             data_stats=training_window_stats(daily_data, targets))
         
     except Exception as e:
         print(f"❌ Error in dummy model training: {e}")
@@ -514,22 +286,18 @@ def load_data_and_train_models():
         traceback.print_exc()
         return False
 
-def calculate_prediction_confidence(model, input_data, target_name):
-    """ECHTE confidence calculation gebaseerd op model internals"""
+def calculate_prediction_confidence(model, input_data, target_name, output_column=None, tree_predictions=None):
+    """ECHTE confidence calculation gebaseerd op model internals
+
+    For multi-output models pass the category's output_column, and optionally the
+    (n_outputs, n_trees) per-tree predictions already computed for this input (see ensemble_outputs).
+    """
     try:
         if hasattr(model, 'estimators_'):
-            # Random Forest: tree consensus (dit is al goed)
-            predictions = np.array([tree.predict(input_data)[0] for tree in model.estimators_])
-            mean_pred = np.mean(predictions)
-            std_pred = np.std(predictions)
-            
-            if mean_pred == 0:
-                return 0.3
-            
-            relative_std = std_pred / abs(mean_pred) if abs(mean_pred) > 0 else 1.0
-            confidence = max(0.3, min(0.9, 1.0 - relative_std))
-            
-            return round(confidence, 3)
+            # Random Forest: tree consensus, all trees evaluated in one vectorized pass
+            if tree_predictions is None:
+                tree_predictions = tree_outputs(model, input_data)[0]
+            return float(consensus_confidence(tree_predictions[output_column or 0]))
             
         else:
             # Decision Tree: ECHTE confidence gebaseerd op leaf statistics
@@ -579,62 +347,38 @@ def calculate_prediction_confidence(model, input_data, target_name):
         print(f"Error calculating confidence for {target_name}: {e}")
         return 0.3
 
-def predict_waste(date_str: str, latitude: float, longitude: float):
-    """Predict waste for specific date and location (weather is automatically fetched)"""
+async def predict_waste(date_str: str, latitude: float, longitude: float):
+    """Predict waste for specific date and location (weather is automatically fetched)
+
+    Repeated inputs are answered from the prediction cache until new models are published;
+    concurrent calls with the same normalized inputs share one weather fetch and one inference.
+    """
+    # The whole request uses one snapshot, even if new models are published meanwhile
+    snapshot = models.current
+    date_obj = datetime.strptime(date_str, '%Y-%m-%d').date()
+    key = (date_obj.isoformat(), round(latitude, 6), round(longitude, 6))
+    result = prediction_cache.get(snapshot.version, key)
+    if result is not None:
+        return result
     
+    result = await prediction_flights.do((snapshot.version, *key), lambda: _predict_waste(snapshot, *key))
+    # Fallback weather is not cached; only final archive weather is kept until the models change,
+    # forecast and partial weather is refreshed like the weather cache
+    weather_data = result[-1]
+    if not weather_data['weather_source'].startswith('Fallback'):
+        ttl = None if weather_data.get('final') else Config.WEATHER_FORECAST_TTL_SECONDS
+        prediction_cache.put(snapshot.version, key, result, ttl)
+    return result
+
+async def _predict_waste(snapshot: ModelSnapshot, date_str: str, latitude: float, longitude: float):
     # Get weather data from OpenMeteo
-    weather_data = get_weather_from_openmeteo(date_str, latitude, longitude)
+    weather_data = await get_weather_from_openmeteo(date_str, latitude, longitude)
     temperature = weather_data['temperature']
     weather_description = weather_data['weather_description']
     
-    # Convert date string to datetime
+    # Same features and encodings as during training
     date_obj = datetime.strptime(date_str, '%Y-%m-%d').date()
-    
-    # Extract date features
-    year = date_obj.year
-    month = date_obj.month
-    day = date_obj.day
-    weekday = date_obj.weekday()
-    
-    # Calculate derived features
-    is_weekend = 1 if weekday >= 5 else 0
-    season_mapping = {
-        12: 0, 1: 0, 2: 0,  # Winter
-        3: 1, 4: 1, 5: 1,   # Spring  
-        6: 2, 7: 2, 8: 2,   # Summer
-        9: 3, 10: 3, 11: 3  # Autumn
-    }
-    season = season_mapping[month]
-    
-    # Map weather description to numeric (update mapping for English)
-    weather_mapping_english = {
-        'Clear sky': 0,
-        'Mainly clear': 1,
-        'Partly cloudy': 1,
-        'Overcast': 2,
-        'Cloudy': 2,
-        'Fog': 6,
-        'Light drizzle': 3,
-        'Moderate drizzle': 3,
-        'Dense drizzle': 3,
-        'Slight rain': 3,
-        'Moderate rain': 3,
-        'Heavy rain': 3,
-        'Rainy': 3,
-        'Thunderstorm': 4,
-        'Slight snow fall': 5,
-        'Moderate snow fall': 5,
-        'Heavy snow fall': 5,
-        'Unknown': 1
-    }
-    
-    weather_num = weather_mapping_english.get(weather_description, 1)
-    
-    # Create input data
-    input_values = np.array([[
-        latitude, longitude, year, month, day, weekday,
-        temperature, weather_num, is_weekend, season
-    ]])
+    input_values = feature_vector(date_obj, latitude, longitude, temperature, weather_description)
     
     # Make predictions for all categories
     categories = ['Plastic', 'Paper', 'Organic', 'Glass']  # English names
@@ -650,15 +394,18 @@ def predict_waste(date_str: str, latitude: float, longitude: float):
         'Glass': 'Glas'
     }
     
+    # Multi-output models are shared by all categories: traverse each one once per request
+    shared_outputs = {}
+    
     for category in categories:
         dutch_category = category_mapping[category]
         
         # Use Random Forest if available, otherwise Decision Tree
-        if dutch_category in rf_models:
-            model = rf_models[dutch_category]
+        if dutch_category in snapshot.rf_models:
+            model = snapshot.rf_models[dutch_category]
             model_type = "random_forest"
-        elif dutch_category in dt_models:
-            model = dt_models[dutch_category]
+        elif dutch_category in snapshot.dt_models:
+            model = snapshot.dt_models[dutch_category]
             model_type = "decision_tree"
         else:
             predictions[category] = 0
@@ -667,12 +414,21 @@ def predict_waste(date_str: str, latitude: float, longitude: float):
             continue
         
         try:
-            # Make prediction
-            prediction = model.predict(input_values)[0]
+            output_column = snapshot.output_columns.get(dutch_category)
+            if output_column is None:
+                # Make prediction
+                prediction = model.predict(input_values)[0]
+                
+                # Calculate confidence
+                confidence = calculate_prediction_confidence(model, input_values, dutch_category)
+            else:
+                if id(model) not in shared_outputs:
+                    shared_outputs[id(model)] = ensemble_outputs(model, input_values)
+                row, tree_predictions = shared_outputs[id(model)]
+                prediction = row[output_column]
+                confidence = calculate_prediction_confidence(model, input_values, dutch_category,
+                                                             output_column, tree_predictions)
             predictions[category] = max(0, round(prediction))
-            
-            # Calculate confidence
-            confidence = calculate_prediction_confidence(model, input_values, dutch_category)
             confidence_scores[category] = confidence
             model_used_per_category[category] = model_type
             
@@ -696,41 +452,31 @@ def predict_waste(date_str: str, latitude: float, longitude: float):
 def get_best_model_type():
     """Eenvoudige best model bepaling"""
     # Random Forest is meestal beter
-    return "random_forest" if rf_models else "decision_tree"
+    return "random_forest" if models.current.rf_models else "decision_tree"
 
 # Startup function - aangeroepen wanneer server start
-def startup_models_dummy():
-    """Initialize models on startup"""
+async def startup_models_dummy():
+    """Initialize models; run by the background training worker"""
     print("Starting Waste Prediction API...")
-    success = load_data_and_train_models()
+    success = await load_data_and_train_models()
     if not success:
         print("Warning: Failed to load data and train models")
     else:
         print("Models loaded successfully!")
-
-# Call startup function when module is imported
-startup_models_dummy()
+    return success
 
 @router.post("/predict/dummy", response_model=PredictionResponse)
 async def predict_waste_endpoint(request: PredictionRequest):
     """Predict waste amounts - weather data is automatically fetched from OpenMeteo"""
+    # Models are trained in the background; answer 503 + Retry-After until they are ready
+    require_ready(model_status)
+    
     try:
         # Validate date format
         datetime.strptime(request.date, '%Y-%m-%d')
         
-        # Debug: Check model status
-        print(f"🔍 Model check: DT models={len(dt_models)}, RF models={len(rf_models)}")
-        
-        # Check if models are loaded, if not try to load them
-        if not dt_models and not rf_models:
-            print("❌ Models not loaded yet, attempting to load...")
-            success = load_data_and_train_models()
-            if not success:
-                raise HTTPException(status_code=503, detail="Models could not be loaded - API container may not be ready")
-            print(f"🔍 After reload: DT models={len(dt_models)}, RF models={len(rf_models)}")
-        
         # Make prediction (weather is automatically fetched)
-        predictions, confidence_scores, all_model_confidence, model_used, avg_confidence, model_used_per_category, weather_data = predict_waste(
+        predictions, confidence_scores, all_model_confidence, model_used, avg_confidence, model_used_per_category, weather_data = await predict_waste(
             request.date,
             request.latitude,
             request.longitude
@@ -749,10 +495,27 @@ async def predict_waste_endpoint(request: PredictionRequest):
             data_source="TrashItems API + Weather API"
         )
         
+    except HTTPException:
+        raise
     except ValueError as e:
         raise HTTPException(status_code=400, detail=f"Invalid date format. Use YYYY-MM-DD: {str(e)}")
     except Exception as e:
         print(f"Prediction error: {e}")
         import traceback
         traceback.print_exc()
-        raise HTTPException(status_code=500, detail=f"Prediction failed: {str(e)}")
\ No newline at end of file
+        raise HTTPException(status_code=500, detail=f"Prediction failed: {str(e)}")
+
+@router.post("/predict/dummy/batch", response_model=BatchPredictionResponse)
+async def predict_waste_batch_endpoint(request: BatchPredictionRequest):
+    """Predict many (date, location) rows in one call; weather is fetched once per date and grid cell"""
+    return await handle_batch(request, models, model_status, get_weather_from_openmeteo)
+
+@router.post("/predict/dummy/forecast", response_model=ForecastResponse)
+async def predict_waste_forecast_endpoint(request: ForecastRequest):
+    """Predictions for `days` consecutive days at one location, from a single weather range lookup"""
+    return await handle_forecast(request, models, model_status, get_weather_range)
+
+@router.post("/predict/dummy/heatmap", response_model=HeatmapResponse)
+async def predict_waste_heatmap_endpoint(request: HeatmapRequest):
+    """Predictions for every cell of a bounding box grid on one date, evaluated in one pass"""
+    return await handle_heatmap(request, models, model_status, get_weather_from_openmeteo)
@@ -0,0 +1,155 @@
+import multiprocessing
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from sklearn.ensemble import RandomForestRegressor
+from sklearn.metrics import r2_score
+from sklearn.model_selection import train_test_split
+from sklearn.tree import DecisionTreeRegressor
+
+import Config
+from ConfidenceEngine import tree_outputs
+
+MODEL_TYPES = ['decision_tree', 'random_forest']
+
+DEFAULT_PARAMS = {
+    'decision_tree': {'max_depth': 5},
+    'random_forest': {'n_estimators': 100, 'max_depth': 8}
+}
+
+
+def model_params(model_type: str, params=None):
+    """Defaults, overridden by Config.MODEL_PARAMS (e.g. picked from a tuning Pareto front), then by params"""
+    if model_type not in DEFAULT_PARAMS:
+        raise ValueError(f"Unknown model type: {model_type}")
+    return {**DEFAULT_PARAMS[model_type], **Config.MODEL_PARAMS.get(model_type, {}), **(params or {})}
+
+
+def build_model(model_type: str, params=None):
+    params = model_params(model_type, params)
+    if model_type == 'decision_tree':
+        return DecisionTreeRegressor(random_state=42, **params)
+    return RandomForestRegressor(random_state=42, **params)
+
+
+def fit_model(task):
+    """Fit one (category, model type) combination; runs inside a worker process.
+
+    For a multi-output task target_name is a tuple of categories and r2 holds one score per category.
+    """
+    target_name, model_type, X_train, X_test, y_train, y_test = task
+    started = time.perf_counter()
+    model = build_model(model_type)
+    model.fit(X_train, y_train)
+    fit_seconds = time.perf_counter() - started
+    if isinstance(target_name, tuple):
+        r2 = r2_score(y_test, model.predict(X_test), multioutput='raw_values')
+    else:
+        r2 = r2_score(y_test, model.predict(X_test))
+    return target_name, model_type, model, r2, fit_seconds
+
+
+def trainable_targets(daily_data, targets, label):
+    usable = []
+    for target_name in targets:
+        if target_name not in daily_data.columns:
+            print(f"⚠️  Target {target_name} not found in {label} data, skipping")
+            continue
+
+        target = daily_data[target_name]
+
+        # Skip if target has no variance
+        if target.std() == 0:
+            print(f"⚠️  Target {target_name} has no variance, skipping")
+            continue
+        usable.append(target_name)
+    return usable
+
+
+def training_tasks(daily_data, features, targets, label, mode: str = Config.MODEL_MODE):
+    """Tasks per model type: one per category, or one over all categories in multi_output mode.
+
+    Every task uses the same fixed-seed train/test split as serial training. Chronological
+    folds are only used to score candidates in HyperparameterSearch.
+    """
+    targets = trainable_targets(daily_data, targets, label)
+    if mode == 'multi_output':
+        if not targets:
+            return []
+        X_train, X_test, y_train, y_test = train_test_split(
+            daily_data[features].values,
+            daily_data[targets].values,
+            test_size=0.3, random_state=42
+        )
+        return [(tuple(targets), model_type, X_train, X_test, y_train, y_test) for model_type in MODEL_TYPES]
+
+    tasks = []
+    for target_name in targets:
+        X_train, X_test, y_train, y_test = train_test_split(
+            daily_data[features].values,
+            daily_data[target_name].values,
+            test_size=0.3, random_state=42
+        )
+        for model_type in MODEL_TYPES:
+            tasks.append((target_name, model_type, X_train, X_test, y_train, y_test))
+    return tasks
+
+
+def run_tasks(tasks, workers: int = Config.TRAINING_WORKERS):
+    """Fit all tasks, in a process pool when more than one worker is configured"""
+    workers = max(1, min(workers, len(tasks)))
+    if workers == 1:
+        return [fit_model(task) for task in tasks]
+
+    # spawn: the caller runs in a thread next to the event loop, forking that is unsafe
+    with ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context("spawn")) as pool:
+        return list(pool.map(fit_model, tasks))
+
+
+def train_all(daily_data, features, targets, label, workers: int = Config.TRAINING_WORKERS,
+              mode: str = Config.MODEL_MODE):
+    """Train a Decision Tree and a Random Forest per category ("per_category"), or one
+    multi-output Decision Tree and Random Forest over all categories ("multi_output").
+
+    Returns (dt_models, rf_models, dt_r2_scores, rf_r2_scores, fit_times, output_columns).
+    Models and R² scores are keyed per category in both modes; in multi_output mode all
+    categories share one model and output_columns maps each category to its output column.
+    fit_times holds the fit duration in seconds per category (or 'multi_output') and model type.
+    """
+    tasks = training_tasks(daily_data, features, targets, label, mode)
+    started = time.perf_counter()
+    results = run_tasks(tasks, workers)
+    wall_seconds = time.perf_counter() - started
+
+    dt_models, rf_models, dt_r2_scores, rf_r2_scores, fit_times, output_columns = {}, {}, {}, {}, {}, {}
+    for target_name, model_type, model, r2, fit_seconds in results:
+        models, scores = (dt_models, dt_r2_scores) if model_type == 'decision_tree' else (rf_models, rf_r2_scores)
+        if isinstance(target_name, tuple):
+            for column, name in enumerate(target_name):
+                models[name] = model
+                scores[name] = max(0, r2[column])
+                output_columns[name] = column
+            fit_times.setdefault('multi_output', {})[model_type] = round(fit_seconds, 3)
+        else:
+            models[target_name] = model
+            scores[target_name] = max(0, r2)
+            fit_times.setdefault(target_name, {})[model_type] = round(fit_seconds, 3)
+
+    for target_name in dt_models:
+        print(f"  ✅ {target_name}: DT R²={dt_r2_scores[target_name]:.3f}, RF R²={rf_r2_scores[target_name]:.3f}")
+    for name, times in fit_times.items():
+        print(f"     ⏱️  {name}: fit {times['decision_tree']:.2f}s (DT) / {times['random_forest']:.2f}s (RF)")
+    total_fit = sum(sum(times.values()) for times in fit_times.values())
+    print(f"⏱️  {len(results)} fits in {wall_seconds:.2f}s wall time ({total_fit:.2f}s fit time, {max(1, min(workers, len(tasks)))} workers)")
+
+    return dt_models, rf_models, dt_r2_scores, rf_r2_scores, fit_times, output_columns
+
+
+def ensemble_outputs(model, input_values):
+    """One pass over a (multi-output) model: the prediction row and, for forests, every tree's
+    predictions for that row as an (n_outputs, n_trees) array (see ConfidenceEngine.tree_outputs)"""
+    prediction = model.predict(input_values)[0]
+    tree_predictions = None
+    if hasattr(model, 'estimators_'):
+        tree_predictions = tree_outputs(model, input_values)[0]
+    return prediction, tree_predictions
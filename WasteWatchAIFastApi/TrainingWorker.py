@@ -0,0 +1,137 @@
+import asyncio
+from datetime import datetime
+
+from fastapi import HTTPException
+
+import Config
+from SingleFlight import SingleFlight
+
+
+class ModelStatus:
+    """Readiness of one model set; pending -> loading -> ready (or failed, retried later)"""
+
+    def __init__(self, name: str):
+        self.name = name
+        self.state = "pending"
+        self.attempts = 0
+        self.started_at = None
+        self.ready_at = None
+        self.last_error = None
+        self.training = {}  # Published snapshot: version, source and per-model fit times
+        self.reload = None  # Last admin reload
+
+    @property
+    def ready(self) -> bool:
+        return self.state == "ready"
+
+    def mark_loading(self):
+        self.state = "loading"
+        self.attempts += 1
+        self.started_at = datetime.now()
+
+    def mark_ready(self):
+        self.state = "ready"
+        self.ready_at = datetime.now()
+        self.last_error = None
+
+    def mark_failed(self, error: str):
+        self.state = "failed"
+        self.last_error = error
+
+    def snapshot(self):
+        return {
+            'state': self.state,
+            'attempts': self.attempts,
+            'started_at': self.started_at.isoformat() if self.started_at else None,
+            'ready_at': self.ready_at.isoformat() if self.ready_at else None,
+            'load_seconds': round((self.ready_at - self.started_at).total_seconds(), 2) if self.ready and self.started_at else None,
+            'last_error': self.last_error,
+            'training': self.training,
+            'reload': self.reload
+        }
+
+
+model_status = {}
+reload_flights = SingleFlight("reload")
+
+
+def get_status(name: str) -> ModelStatus:
+    if name not in model_status:
+        model_status[name] = ModelStatus(name)
+    return model_status[name]
+
+
+def readiness():
+    """Per-model readiness; ready once every registered model set is ready"""
+    return {
+        'ready': bool(model_status) and all(status.ready for status in model_status.values()),
+        'models': {name: status.snapshot() for name, status in model_status.items()}
+    }
+
+
+def require_ready(status: ModelStatus):
+    """Fail fast with 503 + Retry-After while a model set is still loading"""
+    if not status.ready:
+        raise HTTPException(
+            status_code=503,
+            detail=f"Models '{status.name}' not ready yet ({status.state})",
+            headers={"Retry-After": str(Config.READINESS_RETRY_AFTER_SECONDS)}
+        )
+
+
+async def _run_job(name: str, load, retry_delay: float):
+    status = get_status(name)
+    while True:
+        status.mark_loading()
+        print(f"📊 Loading models '{name}' (attempt {status.attempts})")
+        try:
+            success = await load()
+            error = "data could not be loaded"
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            success = False
+            error = str(e)
+
+        if success:
+            status.mark_ready()
+            print(f"✅ Models '{name}' ready")
+            return
+        status.mark_failed(error)
+        print(f"⚠️  Models '{name}' failed to load ({error}), retrying in {retry_delay}s")
+        await asyncio.sleep(retry_delay)
+
+
+async def run_training_worker(jobs, retry_delay: float = Config.TRAINING_RETRY_DELAY_SECONDS):
+    """Load every (name, load_coroutine_function) job in the background until each one succeeds"""
+    for name, _ in jobs:
+        get_status(name)
+    await asyncio.gather(*(_run_job(name, load, retry_delay) for name, load in jobs))
+
+
+async def reload_models(name: str, load):
+    """Load or train a new model set for `name` while the current one keeps serving.
+
+    The loader publishes the new snapshot itself; concurrent reloads of one model set share a run.
+    """
+    status = get_status(name)
+
+    async def run():
+        status.reload = {'state': 'running', 'started_at': datetime.now().isoformat(), 'finished_at': None}
+        try:
+            success = await load()
+            error = None if success else "data could not be loaded"
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            success = False
+            error = str(e)
+
+        status.reload.update({'state': 'succeeded' if success else 'failed', 'error': error,
+                              'finished_at': datetime.now().isoformat()})
+        if success and not status.ready:
+            status.mark_ready()
+        print(f"{'✅' if success else '⚠️ '} Reload of models '{name}' {status.reload['state']}")
+        return success
+
+    return await reload_flights.do(name, run)
@@ -0,0 +1,236 @@
+import hashlib
+import json
+import os
+import tempfile
+import threading
+from datetime import timedelta
+
+import numpy as np
+import pandas as pd
+
+import Config
+from TrashStream import columns_from_records
+
+_DIGEST_MOD = 2 ** 64
+
+
+def record_digest(record) -> int:
+    """Order-independent per-record hash; a dataset digest is the sum of its record digests"""
+    line = json.dumps(record, sort_keys=True, separators=(',', ':'))
+    return int.from_bytes(hashlib.sha256(line.encode()).digest()[:8], 'big')
+
+
+def records_digest(records) -> str:
+    return f"{sum(record_digest(record) for record in records or []) % _DIGEST_MOD:016x}"
+
+
+def batch_digest(batch: pd.DataFrame) -> int:
+    """Order-independent digest of typed trash columns: sum of vectorized per-row hashes"""
+    rows = batch[['id', 'latitude', 'longitude', 'timestamp']].assign(litterType=batch['litterType'].astype(str))
+    return int(pd.util.hash_pandas_object(rows, index=False).to_numpy().sum(dtype=np.uint64))
+
+
+def typed_items(trash_data) -> pd.DataFrame:
+    """Trash items as typed columns, from a TrashStream DataFrame or a list of records"""
+    return trash_data if isinstance(trash_data, pd.DataFrame) else columns_from_records(trash_data)
+
+
+def summarize_daily(trash: pd.DataFrame):
+    """Per-day counts per litterType plus coordinate sums, the additive form of the daily training data"""
+    datum = trash['timestamp'].dt.normalize()
+    counts = pd.crosstab(datum, trash['litterType'].astype(str)).astype(float)
+    sums = trash.groupby(datum)[['latitude', 'longitude']].sum()
+    sums['items'] = datum.value_counts()
+    counts.index.name = sums.index.name = 'datum'
+    counts.columns.name = None
+    return counts, sums
+
+
+def daily_rows(counts: pd.DataFrame, sums: pd.DataFrame):
+    """Turn daily aggregates into training rows: datum, count per litterType, mean latitude and longitude"""
+    daily_data = counts.copy()
+    daily_data['latitude'] = sums['latitude'] / sums['items']
+    daily_data['longitude'] = sums['longitude'] / sums['items']
+    daily_data = daily_data.sort_index().reset_index()
+    daily_data['datum'] = daily_data['datum'].dt.date
+    return daily_data
+
+
+def daily_from_records(trash_data):
+    """Daily training rows straight from trash items (typed columns or a list of records)"""
+    return daily_rows(*summarize_daily(typed_items(trash_data)))
+
+
+def as_daily_rows(trash_data):
+    """Daily training rows from trash items, or the rows themselves when already aggregated"""
+    if isinstance(trash_data, pd.DataFrame) and 'datum' in trash_data.columns:
+        return trash_data
+    return daily_from_records(trash_data)
+
+
+class TrashStore:
+    """Local columnar store of trash items already downloaded from the backend.
+
+    Keeps every item as typed numpy columns, a timestamp watermark for `since` queries and
+    the daily aggregates used for training, which are updated with each new batch instead
+    of being recomputed from the full history. On disk `path` is a directory with one
+    chunk file per ingested batch plus an aggregates file.
+    """
+
+    COLUMNS = ['id', 'litterType', 'latitude', 'longitude', 'timestamp']
+
+    def __init__(self, path: str, lookback_hours: float = Config.INGEST_LOOKBACK_HOURS):
+        self.path = path
+        self.lookback = timedelta(hours=lookback_hours)
+        self._lock = threading.Lock()
+        self._reset()
+        self.load()
+
+    def _reset(self):
+        self.columns = {
+            'id': np.array([], dtype=object),
+            'litterType': np.array([], dtype=object),
+            'latitude': np.array([], dtype=np.float64),
+            'longitude': np.array([], dtype=np.float64),
+            'timestamp': np.array([], dtype='datetime64[ms]')
+        }
+        self.counts = pd.DataFrame(index=pd.DatetimeIndex([], name='datum'))
+        self.sums = pd.DataFrame({'latitude': [], 'longitude': [], 'items': []},
+                                 index=pd.DatetimeIndex([], name='datum'))
+        self.digest = 0
+        self._ids = set()
+        self._chunks = 0
+        self._pending = []
+
+    def __len__(self):
+        return len(self.columns['id'])
+
+    @property
+    def watermark(self):
+        """Newest item timestamp in the store"""
+        return pd.Timestamp(self.columns['timestamp'].max()) if len(self) else None
+
+    def since(self):
+        """Value for the backend `since` query; overlaps by `lookback` to catch late-arriving items"""
+        watermark = self.watermark
+        if watermark is None:
+            return None
+        return (watermark - self.lookback).strftime('%Y-%m-%dT%H:%M:%S')
+
+    def content_digest(self) -> str:
+        return f"{self.digest:016x}"
+
+    def merge(self, trash_data):
+        """Add items that are not in the store yet; returns the number of new items.
+
+        trash_data is a typed DataFrame from TrashStream or a list of records.
+        """
+        items = typed_items(trash_data)
+        with self._lock:
+            batch = items[~items['id'].isin(self._ids)].drop_duplicates(subset='id')
+            if batch.empty:
+                return 0
+
+            batch = pd.DataFrame({
+                'id': batch['id'].to_numpy(dtype=object),
+                'litterType': batch['litterType'].astype(str).to_numpy(dtype=object),
+                'latitude': batch['latitude'].to_numpy(dtype=np.float64),
+                'longitude': batch['longitude'].to_numpy(dtype=np.float64),
+                'timestamp': batch['timestamp'].to_numpy(dtype='datetime64[ms]')
+            })
+
+            for column in self.COLUMNS:
+                self.columns[column] = np.concatenate([self.columns[column], batch[column].to_numpy()])
+            self._ids.update(batch['id'])
+            self._pending.append(batch)
+            self.digest = (self.digest + batch_digest(batch)) % _DIGEST_MOD
+
+            # Update the daily aggregates with this batch only
+            counts, sums = summarize_daily(batch)
+            self.counts = self.counts.add(counts, fill_value=0).fillna(0)
+            self.sums = self.sums.add(sums, fill_value=0)
+            return len(batch)
+
+    def daily_data(self):
+        """Daily training rows: datum, one count column per litterType, mean latitude and longitude"""
+        with self._lock:
+            return daily_rows(self.counts, self.sums)
+
+    def save(self):
+        """Append new items as a chunk file and rewrite the (small) aggregates file.
+
+        Local writes grow with the new batch, not with the full history.
+        """
+        os.makedirs(self.path, exist_ok=True)
+
+        with self._lock:
+            pending, self._pending = self._pending, []
+            for batch in pending:
+                self._chunks += 1
+                _atomic_savez(os.path.join(self.path, f"chunk_{self._chunks:06d}.npz"), {
+                    'id': batch['id'].to_numpy(dtype=str),
+                    'litterType': batch['litterType'].to_numpy(dtype=str),
+                    'latitude': batch['latitude'].to_numpy(dtype=np.float64),
+                    'longitude': batch['longitude'].to_numpy(dtype=np.float64),
+                    'timestamp': batch['timestamp'].to_numpy(dtype='datetime64[ms]')
+                })
+
+            _atomic_savez(os.path.join(self.path, "aggregates.npz"), {
+                'chunks': np.array([self._chunks]),
+                'digest': np.array([self.digest], dtype=np.uint64),
+                'daily_index': self.counts.index.to_numpy(dtype='datetime64[ms]'),
+                'daily_types': np.array(list(self.counts.columns), dtype=str),
+                'daily_counts': self.counts.to_numpy(dtype=np.float64),
+                'sums_index': self.sums.index.to_numpy(dtype='datetime64[ms]'),
+                'sums': self.sums[['latitude', 'longitude', 'items']].to_numpy(dtype=np.float64)
+            })
+
+    def load(self):
+        aggregates_path = os.path.join(self.path, "aggregates.npz")
+        if not os.path.exists(aggregates_path):
+            return
+        try:
+            with np.load(aggregates_path, allow_pickle=False) as data:
+                chunks = int(data['chunks'][0])
+                digest = int(data['digest'][0])
+                counts = pd.DataFrame(data['daily_counts'], columns=list(data['daily_types']),
+                                      index=pd.DatetimeIndex(data['daily_index'], name='datum'))
+                sums = pd.DataFrame(data['sums'], columns=['latitude', 'longitude', 'items'],
+                                    index=pd.DatetimeIndex(data['sums_index'], name='datum'))
+
+            parts = {column: [] for column in self.COLUMNS}
+            for chunk in range(1, chunks + 1):
+                with np.load(os.path.join(self.path, f"chunk_{chunk:06d}.npz"), allow_pickle=False) as data:
+                    for column in self.COLUMNS:
+                        parts[column].append(data[column])
+        except Exception as e:
+            print(f"⚠️  Could not read trash store {self.path}, starting empty: {e}")
+            return
+
+        with self._lock:
+            for column in self.COLUMNS:
+                if parts[column]:
+                    values = np.concatenate(parts[column])
+                    self.columns[column] = values.astype(object) if column in ('id', 'litterType') else values
+            self.counts = counts
+            self.sums = sums
+            self.digest = digest
+            self._chunks = chunks
+            self._ids = set(self.columns['id'])
+        print(f"📦 Trash store {os.path.basename(self.path)}: {len(self)} items up to {self.watermark}")
+
+
+def _atomic_savez(path: str, arrays: dict):
+    fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), suffix='.tmp')
+    try:
+        with os.fdopen(fd, 'wb') as f:
+            np.savez(f, **arrays)
+        os.replace(tmp_path, path)
+    except Exception:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+
+
+def trash_store_for(name: str):
+    return TrashStore(os.path.join(Config.TRASH_STORE_DIR, name))
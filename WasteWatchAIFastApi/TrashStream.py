@@ -0,0 +1,147 @@
+import json
+import re
+
+import numpy as np
+import pandas as pd
+
+# Items are buffered per block and converted to typed arrays, so parse memory does not grow with the payload
+BLOCK_SIZE = 8192
+
+# Timezone suffixes are dropped: the training code works with wall clock time
+_TIMEZONE_SUFFIX = re.compile(r'(Z|[+-]\d{2}:?\d{2})$')
+
+
+def parse_timestamp_block(values):
+    """Fixed-format ISO8601 ("YYYY-MM-DDTHH:MM:SS[.fffffff]") to datetime64[ms] in one vectorized call"""
+    strings = np.array(values, dtype=str)
+    if strings.size:
+        # Timezone designators start after the date part: "Z", "+hh:mm" or a third "-"
+        has_timezone = (np.char.endswith(strings, 'Z') | (np.char.find(strings, '+') > 0)
+                        | (np.char.count(strings, '-') > 2))
+        if has_timezone.any():
+            strings[has_timezone] = [_TIMEZONE_SUFFIX.sub('', value) for value in strings[has_timezone]]
+    return strings.astype('datetime64[ms]')
+
+
+class JsonArrayStream:
+    """Incremental parser for a top-level JSON array: feed text chunks, get back completed elements"""
+
+    def __init__(self):
+        self._decoder = json.JSONDecoder()
+        self._buffer = ''
+        self._started = False
+        self.finished = False
+
+    def feed(self, text: str):
+        self._buffer += text
+        buffer = self._buffer
+        position = 0
+        items = []
+        while not self.finished:
+            while position < len(buffer) and buffer[position] in ' \t\r\n,':
+                position += 1
+            if position >= len(buffer):
+                break
+            if not self._started:
+                if buffer[position] != '[':
+                    raise ValueError("Expected a JSON array")
+                self._started = True
+                position += 1
+                continue
+            if buffer[position] == ']':
+                self.finished = True
+                position += 1
+                break
+            try:
+                item, end = self._decoder.raw_decode(buffer, position)
+            except json.JSONDecodeError:
+                break  # Element not complete yet, wait for more text
+            if not isinstance(item, (dict, list, str)):
+                # A number (or literal) may continue in the next chunk: only complete once a delimiter follows
+                delimiter = end
+                while delimiter < len(buffer) and buffer[delimiter] in ' \t\r\n':
+                    delimiter += 1
+                if delimiter >= len(buffer) or buffer[delimiter] not in ',]':
+                    break
+            position = end
+            items.append(item)
+        self._buffer = buffer[position:]
+        return items
+
+    def close(self):
+        if not self.finished:
+            raise ValueError("Truncated JSON array")
+
+
+class TrashColumnsBuilder:
+    """Collects TrashItems into typed columns: id, categorical litterType, float64 coordinates, datetime64 timestamps"""
+
+    def __init__(self, block_size: int = BLOCK_SIZE):
+        self.block_size = block_size
+        self._categories = {}
+        self._parts = {'id': [], 'litterType': [], 'latitude': [], 'longitude': [], 'timestamp': []}
+        self._block = {name: [] for name in self._parts}
+
+    def add(self, item):
+        block = self._block
+        litter_type = item['litterType']
+        code = self._categories.get(litter_type)
+        if code is None:
+            code = self._categories[litter_type] = len(self._categories)
+        block['id'].append(str(item['id']))
+        block['litterType'].append(code)
+        block['latitude'].append(item['latitude'])
+        block['longitude'].append(item['longitude'])
+        block['timestamp'].append(item['timestamp'])
+        if len(block['id']) >= self.block_size:
+            self._flush()
+
+    def _flush(self):
+        block = self._block
+        if not block['id']:
+            return
+        self._parts['id'].append(np.array(block['id'], dtype=object))
+        self._parts['litterType'].append(np.array(block['litterType'], dtype=np.int32))
+        self._parts['latitude'].append(np.array(block['latitude'], dtype=np.float64))
+        self._parts['longitude'].append(np.array(block['longitude'], dtype=np.float64))
+        self._parts['timestamp'].append(parse_timestamp_block(block['timestamp']))
+        self._block = {name: [] for name in self._parts}
+
+    def finish(self) -> pd.DataFrame:
+        self._flush()
+        empty = {'id': object, 'litterType': np.int32, 'latitude': np.float64,
+                 'longitude': np.float64, 'timestamp': 'datetime64[ms]'}
+        columns = {
+            name: np.concatenate(parts) if parts else np.array([], dtype=empty[name])
+            for name, parts in self._parts.items()
+        }
+        categories = sorted(self._categories, key=self._categories.get)
+        columns['litterType'] = pd.Categorical.from_codes(columns['litterType'], categories=categories)
+        return pd.DataFrame(columns)
+
+
+def columns_from_records(records) -> pd.DataFrame:
+    """Typed trash columns from already decoded records"""
+    builder = TrashColumnsBuilder()
+    for record in records:
+        builder.add(record)
+    return builder.finish()
+
+
+async def stream_trash_items(client, url: str, headers=None, params=None, timeout: float = 15):
+    """GET a TrashItems endpoint and parse the JSON array straight into typed columns.
+
+    Returns (status_code, body_text, items); items is None when the status is not 200.
+    """
+    async with client.stream("GET", url, headers=headers, params=params, timeout=timeout) as response:
+        if response.status_code != 200:
+            await response.aread()
+            return response.status_code, response.text, None
+
+        parser = JsonArrayStream()
+        builder = TrashColumnsBuilder()
+        async for chunk in response.aiter_text():
+            for item in parser.feed(chunk):
+                builder.add(item)
+        parser.close()
+    return response.status_code, None, builder.finish()
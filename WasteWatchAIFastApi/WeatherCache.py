@@ -0,0 +1,185 @@
+import os
+import sqlite3
+import threading
+import time
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional
+
+import Config
+
+
+class WeatherCache:
+    """SQLite cache for daily Open-Meteo values, one row per (location, day, variable).
+
+    Complete archive values for days in the past never expire; forecast days,
+    incomplete values and past days from forecast models expire after `forecast_ttl` seconds.
+    """
+
+    def __init__(self, path: str, forecast_ttl: int = 3600, grid_degrees: float = 0.1):
+        self.path = path
+        self.forecast_ttl = forecast_ttl
+        self.grid_degrees = grid_degrees
+        self.hits = 0
+        self.misses = 0
+        # Upstream call durations, reported by the weather client; each hit saves one average call
+        self.upstream_calls = 0
+        self.upstream_seconds = 0.0
+        self.saved_seconds = 0.0
+        self._lock = threading.Lock()
+
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        with self._lock:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute("""
+                CREATE TABLE IF NOT EXISTS weather_daily (
+                    lat_key REAL NOT NULL,
+                    lon_key REAL NOT NULL,
+                    day TEXT NOT NULL,
+                    variable TEXT NOT NULL,
+                    value REAL,
+                    fetched_at REAL NOT NULL,
+                    expires_at REAL,
+                    PRIMARY KEY (lat_key, lon_key, day, variable)
+                )
+            """)
+            self._conn.commit()
+
+    def location_key(self, latitude: float, longitude: float):
+        """Snap coordinates to the weather grid so nearby points share cache rows"""
+        return snap_coordinates(latitude, longitude, self.grid_degrees)
+
+    def get_daily(self, latitude: float, longitude: float, start_date: str, end_date: str,
+                  variables: List[str], allow_expired: bool = False, count: bool = True) -> Optional[Dict]:
+        """Return an Open-Meteo style payload ({'daily': {...}}) if every day and variable is cached.
+
+        allow_expired also returns stale forecast rows (used while the upstream is down).
+        count=False leaves the hit/miss counters to the caller (see WeatherClient.get_day).
+        'final' is True when every returned value is final archive data that never expires.
+        """
+        lat_key, lon_key = self.location_key(latitude, longitude)
+        days = _date_range(start_date, end_date)
+        now = 0 if allow_expired else time.time()
+
+        with self._lock:
+            rows = self._conn.execute(
+                f"""
+                SELECT day, variable, value, expires_at FROM weather_daily
+                WHERE lat_key = ? AND lon_key = ? AND day BETWEEN ? AND ?
+                  AND variable IN ({','.join('?' * len(variables))})
+                  AND (expires_at IS NULL OR expires_at > ?)
+                """,
+                (lat_key, lon_key, start_date, end_date, *variables, now)
+            ).fetchall()
+
+        values = {(day, variable): value for day, variable, value, _ in rows}
+        if len(values) < len(days) * len(variables):
+            if count:
+                self.record_lookup(hit=False)
+            return None
+
+        if count:
+            self.record_lookup(hit=True)
+        daily = {'time': days}
+        for variable in variables:
+            daily[variable] = [values[(day, variable)] for day in days]
+        final = all(expires_at is None for *_, expires_at in rows)
+        return {'daily': daily, 'cached': True, 'final': final}
+
+    def put_daily(self, latitude: float, longitude: float, daily: Dict, final: bool = True):
+        """Store every day and variable of an Open-Meteo 'daily' block.
+
+        final=False marks provisional data (forecast or historical-forecast models): it expires
+        like a forecast, also for past days, and never replaces a stored final value.
+        """
+        lat_key, lon_key = self.location_key(latitude, longitude)
+        days = daily.get('time') or []
+        today = datetime.now().date().isoformat()
+        now = time.time()
+
+        rows = []
+        for variable, column in daily.items():
+            if variable == 'time' or not isinstance(column, list):
+                continue
+            for day, value in zip(days, column):
+                # Past archive days with a value are final; everything else is refreshed later
+                expires_at = None if final and day < today and value is not None else now + self.forecast_ttl
+                rows.append((lat_key, lon_key, day, variable, value, now, expires_at))
+
+        if not rows:
+            return
+
+        if final:
+            statement = "INSERT OR REPLACE INTO weather_daily VALUES (?, ?, ?, ?, ?, ?, ?)"
+        else:
+            statement = """
+                INSERT INTO weather_daily VALUES (?, ?, ?, ?, ?, ?, ?)
+                ON CONFLICT (lat_key, lon_key, day, variable) DO UPDATE SET
+                    value = excluded.value, fetched_at = excluded.fetched_at, expires_at = excluded.expires_at
+                WHERE weather_daily.expires_at IS NOT NULL
+            """
+        with self._lock:
+            self._conn.executemany(statement, rows)
+            self._conn.commit()
+
+    def record_lookup(self, hit: bool):
+        """Count one weather lookup; a hit saves one average upstream call"""
+        if not hit:
+            self.misses += 1
+            return
+        self.hits += 1
+        if self.upstream_calls:
+            self.saved_seconds += self.upstream_seconds / self.upstream_calls
+
+    def record_upstream(self, seconds: float):
+        """Duration of one upstream weather call, used to estimate the time saved by hits"""
+        self.upstream_calls += 1
+        self.upstream_seconds += seconds
+
+    def purge_expired(self):
+        """Delete expired forecast rows"""
+        with self._lock:
+            deleted = self._conn.execute(
+                "DELETE FROM weather_daily WHERE expires_at IS NOT NULL AND expires_at <= ?", (time.time(),)
+            ).rowcount
+            self._conn.commit()
+        return deleted
+
+    def stats(self):
+        with self._lock:
+            rows = self._conn.execute("SELECT COUNT(*) FROM weather_daily").fetchone()[0]
+        total = self.hits + self.misses
+        return {
+            'rows': rows,
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_rate': round(self.hits / total, 3) if total else 0.0,
+            'avg_upstream_ms': round(self.upstream_seconds / self.upstream_calls * 1000, 1) if self.upstream_calls else None,
+            'saved_seconds': round(self.saved_seconds, 3)
+        }
+
+
+def snap_coordinates(latitude: float, longitude: float, grid_degrees: float = Config.WEATHER_GRID_DEGREES):
+    """Snap a point to the nearest grid node; points in the same grid cell get the same coordinates"""
+    if not grid_degrees:
+        return float(latitude), float(longitude)
+    return (
+        round(round(float(latitude) / grid_degrees) * grid_degrees, 6),
+        round(round(float(longitude) / grid_degrees) * grid_degrees, 6)
+    )
+
+
+def _date_range(start_date: str, end_date: str):
+    start = datetime.strptime(start_date, '%Y-%m-%d').date()
+    end = datetime.strptime(end_date, '%Y-%m-%d').date()
+    return [(start + timedelta(days=i)).isoformat() for i in range((end - start).days + 1)]
+
+
+weather_cache = WeatherCache(
+    Config.WEATHER_CACHE_PATH,
+    forecast_ttl=Config.WEATHER_FORECAST_TTL_SECONDS,
+    grid_degrees=Config.WEATHER_GRID_DEGREES
+)
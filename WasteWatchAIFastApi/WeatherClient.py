@@ -0,0 +1,348 @@
+import asyncio
+import calendar
+import threading
+import time
+from collections import OrderedDict
+from datetime import datetime, timedelta, date
+from typing import Dict, List, Optional, Tuple
+
+import Config
+import HttpClient
+from SingleFlight import SingleFlight
+from CircuitBreaker import CircuitBreaker, CircuitOpenError
+from WeatherCache import weather_cache
+
+ARCHIVE_URL = Config.OPEN_METEO_ARCHIVE_URL
+FORECAST_URL = Config.OPEN_METEO_FORECAST_URL
+HISTORICAL_FORECAST_URL = Config.OPEN_METEO_HISTORICAL_FORECAST_URL
+
+# One block holds every variable any module needs, so blocks can be shared
+DAILY_VARIABLES = [
+    'temperature_2m_mean', 'temperature_2m_max', 'temperature_2m_min',
+    'precipitation_sum', 'weather_code'
+]
+
+
+class WeatherBlock:
+    """Columnar daily weather for a contiguous date range"""
+
+    def __init__(self, start: date, daily: Dict, expires_at: Optional[float]):
+        self.start = start
+        self.time = list(daily.get('time') or [])
+        self.columns = {
+            variable: list(daily.get(variable) or [None] * len(self.time))
+            for variable in DAILY_VARIABLES
+        }
+        self.expires_at = expires_at
+
+    def is_expired(self):
+        return self.expires_at is not None and self.expires_at <= time.time()
+
+    def day(self, date_str: str) -> Optional[Dict]:
+        """Single-day payload in Open-Meteo shape, or None if the day is not in this block.
+
+        'final' is True for complete archive blocks that never expire.
+        """
+        offset = (datetime.strptime(date_str, '%Y-%m-%d').date() - self.start).days
+        if offset < 0 or offset >= len(self.time) or self.time[offset] != date_str:
+            return None
+        daily = {'time': [date_str]}
+        for variable, column in self.columns.items():
+            daily[variable] = [column[offset]]
+        return {'daily': daily, 'final': self.expires_at is None}
+
+
+def forecast_window(forecast_days: int = Config.WEATHER_FORECAST_DAYS, today: date = None):
+    """(first, last) day covered by the forecast block: tomorrow up to today + forecast_days - 1"""
+    today = today or datetime.now().date()
+    return today + timedelta(days=1), today + timedelta(days=forecast_days - 1)
+
+
+class WeatherClient:
+    """Open-Meteo client that fetches month or forecast-window blocks and answers per-day lookups from them"""
+
+    def __init__(self, cache, forecast_days: int = 16, max_blocks: int = 256, breaker: CircuitBreaker = None):
+        self.cache = cache
+        self.breaker = breaker or CircuitBreaker("open-meteo")
+        self.forecast_days = forecast_days
+        self.max_blocks = max_blocks
+        self.upstream_calls = 0
+        self._blocks = OrderedDict()
+        self._flights = SingleFlight("weather")
+        self._lock = threading.Lock()
+
+    def block_range(self, target_date: date):
+        """Return (api_url, start, end) of the block that contains target_date"""
+        today = datetime.now().date()
+        if target_date <= today:
+            # Archive: the whole calendar month, up to today
+            start = target_date.replace(day=1)
+            last_day = calendar.monthrange(target_date.year, target_date.month)[1]
+            end = min(target_date.replace(day=last_day), today)
+            return ARCHIVE_URL, start, end
+        # Forecast: the full forecast window starting tomorrow
+        return (FORECAST_URL, *forecast_window(self.forecast_days, today))
+
+    async def get_day(self, date_str: str, latitude: float, longitude: float) -> Dict:
+        """Return {'daily': {...}} with one day of DAILY_VARIABLES, fetching its block if needed.
+
+        Every lookup counts once in the weather cache stats: a miss only for the caller whose
+        lookup went upstream, a hit when served from a block, the cache or a shared fetch.
+        """
+        lat_key, lon_key = self.cache.location_key(latitude, longitude)
+        target_date = datetime.strptime(date_str, '%Y-%m-%d').date()
+        api_url, start, end = self.block_range(target_date)
+        block_key = (lat_key, lon_key, api_url, start)
+
+        # 1. In-memory block
+        with self._lock:
+            block = self._blocks.get(block_key)
+            if block is not None and not block.is_expired():
+                self._blocks.move_to_end(block_key)
+                day = block.day(date_str)
+                if day is not None:
+                    self.cache.record_lookup(hit=True)
+                    return day
+
+        # 2. Persistent cache for just this day
+        cached = self.cache.get_daily(lat_key, lon_key, date_str, date_str, DAILY_VARIABLES, count=False)
+        if cached is not None:
+            self.cache.record_lookup(hit=True)
+            return cached
+
+        # 3. Fetch the whole block upstream, shared with concurrent lookups for the same block
+        fetched = []
+
+        def fetch():
+            # Only runs for the caller that starts the flight
+            fetched.append(True)
+            return self.fetch_block(api_url, lat_key, lon_key, start, end)
+
+        try:
+            block = await self._flights.do(block_key, fetch)
+        except CircuitOpenError:
+            self.cache.record_lookup(hit=False)
+            # Upstream is down: serve the last known value (even if expired) instead of failing
+            stale = block.day(date_str) if block is not None else None
+            stale = stale or self.cache.get_daily(lat_key, lon_key, date_str, date_str, DAILY_VARIABLES,
+                                                  allow_expired=True, count=False)
+            if stale is None:
+                raise
+            print(f"⚡ Circuit open, serving last cached weather for {date_str}")
+            return stale
+        except Exception:
+            self.cache.record_lookup(hit=False)
+            raise
+
+        self.cache.record_lookup(hit=not fetched)
+        day = block.day(date_str)
+        if day is None:
+            raise Exception(f"OpenMeteo block {start} - {end} does not contain {date_str}")
+        return day
+
+    async def get_range(self, start_date: str, days: int, latitude: float, longitude: float) -> List:
+        """One-day payloads (see get_day) for `days` consecutive days from start_date.
+
+        All days are looked up concurrently, so days in the same block share one upstream fetch:
+        a forecast window starting tomorrow costs a single call. A day that failed is returned
+        as its exception instead of failing the whole range.
+        """
+        start = datetime.strptime(start_date, '%Y-%m-%d').date()
+        dates = [(start + timedelta(days=offset)).isoformat() for offset in range(days)]
+        return await asyncio.gather(
+            *(self.get_day(date_str, latitude, longitude) for date_str in dates), return_exceptions=True
+        )
+
+    async def prefetch_forecast(self, latitude: float, longitude: float) -> int:
+        """Refresh the full forecast window for a location; returns the number of days loaded"""
+        lat_key, lon_key = self.cache.location_key(latitude, longitude)
+        api_url, start, end = self.block_range(datetime.now().date() + timedelta(days=1))
+        block_key = (lat_key, lon_key, api_url, start)
+        block = await self._flights.do(
+            block_key, lambda: self.fetch_block(api_url, lat_key, lon_key, start, end)
+        )
+        return len(block.time)
+
+    async def _get(self, url: str, params: Dict, timeout: float):
+        """GET through the shared client, guarded by the circuit breaker"""
+        if not self.breaker.allow_request():
+            raise CircuitOpenError(f"Circuit '{self.breaker.name}' is open, skipping {url}")
+
+        started = time.monotonic()
+        try:
+            response = await HttpClient.get_client().get(url, params=params, timeout=timeout)
+        except asyncio.CancelledError:
+            self.breaker.cancel_trial()
+            raise
+        except Exception as e:
+            self.breaker.record_failure(e)
+            raise
+
+        if response.status_code >= 500:
+            self.breaker.record_failure(f"status {response.status_code}")
+        else:
+            # 4xx means the upstream is healthy but rejected the parameters
+            self.breaker.record_success(time.monotonic() - started)
+            self.cache.record_upstream(time.monotonic() - started)
+        return response
+
+    async def fetch_block(self, api_url: str, latitude: float, longitude: float, start: date, end: date) -> WeatherBlock:
+        """Fetch one date range in a single upstream call and keep it in memory and in the cache"""
+        params = {
+            'latitude': latitude,
+            'longitude': longitude,
+            'start_date': start.isoformat(),
+            'end_date': end.isoformat(),
+            'daily': ','.join(DAILY_VARIABLES),
+            'timezone': 'Europe/Amsterdam'
+        }
+
+        print(f"🌤️ Fetching weather block {start} - {end} from OpenMeteo...")
+        self.upstream_calls += 1
+        response = await self._get(api_url, params, timeout=10)
+        if response.status_code != 200:
+            raise Exception(f"OpenMeteo API returned status {response.status_code}: {response.text}")
+
+        data = response.json()
+        daily = data.get('daily')
+        if not daily or not daily.get('time'):
+            raise Exception(f"Invalid OpenMeteo response structure: {data}")
+
+        final = api_url == ARCHIVE_URL
+        self.cache.put_daily(latitude, longitude, daily, final=final)
+
+        # Blocks with forecast or incomplete days are refreshed after the forecast TTL
+        complete = all(value is not None for value in daily.get('temperature_2m_max') or [None])
+        today = datetime.now().date()
+        expires_at = None if final and end < today and complete else time.time() + self.cache.forecast_ttl
+
+        block = WeatherBlock(start, daily, expires_at)
+        with self._lock:
+            self._blocks[(latitude, longitude, api_url, start)] = block
+            self._blocks.move_to_end((latitude, longitude, api_url, start))
+            while len(self._blocks) > self.max_blocks:
+                self._blocks.popitem(last=False)
+
+        print(f"✅ Weather block loaded: {len(block.time)} days")
+        return block
+
+    async def fetch_daily(self, label: str, url: str, params: Dict, timeout: float = 15) -> Dict:
+        """One upstream attempt; returns the payload only if it has a valid 'daily' block"""
+        print(f"Trying {label}: {url}")
+        response = await self._get(url, params, timeout)
+        print(f"{label} response status: {response.status_code}")
+        if response.status_code != 200:
+            raise Exception(f"{label} failed with status {response.status_code}: {response.text[:200]}")
+
+        data = response.json()
+        if not (data.get("daily") and data["daily"].get("time")):
+            raise Exception(f"{label} returned empty data structure")
+
+        # Only archive values are final; forecast models (also for past days) are refreshed later
+        self.cache.put_daily(params["latitude"], params["longitude"], data["daily"], final=url == ARCHIVE_URL)
+        data["source"] = label
+        return data
+
+    async def fetch_first_valid(self, attempts: List[Tuple[str, str, Dict]], mode: str = "hedge",
+                                hedge_delay: float = 2.0, deadline: Optional[float] = None,
+                                timeout: float = 15) -> Optional[Dict]:
+        """Return the first valid payload from a list of (label, url, params) attempts.
+
+        mode "sequential" tries one endpoint after another, "race" starts all of them
+        at once and "hedge" starts the next endpoint when the previous one fails or has
+        not answered within hedge_delay seconds. Returns None when every attempt failed
+        or the deadline (seconds) passed.
+        """
+        loop = asyncio.get_running_loop()
+        deadline_at = loop.time() + deadline if deadline else None
+        queue = list(attempts)
+        pending = set()
+
+        def launch():
+            label, url, params = queue.pop(0)
+            pending.add(asyncio.create_task(self.fetch_daily(label, url, params, timeout)))
+
+        try:
+            launch()
+            while mode == "race" and queue:
+                launch()
+
+            while pending or queue:
+                if not pending:
+                    launch()
+
+                wait_timeout = hedge_delay if mode == "hedge" and queue else None
+                if deadline_at is not None:
+                    remaining = deadline_at - loop.time()
+                    if remaining <= 0:
+                        print(f"Weather deadline of {deadline}s reached")
+                        return None
+                    wait_timeout = remaining if wait_timeout is None else min(wait_timeout, remaining)
+
+                done, _ = await asyncio.wait(pending, timeout=wait_timeout, return_when=asyncio.FIRST_COMPLETED)
+                if not done:
+                    # Slow upstream: hedge with the next endpoint
+                    if queue and (deadline_at is None or loop.time() < deadline_at):
+                        launch()
+                    continue
+
+                result = None
+                for task in done:
+                    pending.discard(task)
+                    try:
+                        data = task.result()
+                    except Exception as e:
+                        print(f"Weather attempt failed: {e}")
+                        continue
+                    if result is None:
+                        result = data
+                if result is not None:
+                    return result
+            return None
+        finally:
+            for task in pending:
+                task.cancel()
+
+    async def run_probe(self, interval: float, latitude: float = 51.5865, longitude: float = 4.7761):
+        """Background task: while the circuit is open, probe Open-Meteo so it can close again"""
+        while True:
+            await asyncio.sleep(interval)
+            if not self.breaker.is_open():
+                continue
+            params = {
+                'latitude': latitude,
+                'longitude': longitude,
+                'daily': 'weather_code',
+                'forecast_days': 1,
+                'timezone': 'Europe/Amsterdam'
+            }
+            try:
+                response = await self._get(FORECAST_URL, params, timeout=5)
+                print(f"🔎 Weather probe: status {response.status_code}, circuit {self.breaker.state}")
+            except CircuitOpenError:
+                pass
+            except Exception as e:
+                print(f"🔎 Weather probe failed: {e}")
+
+    def stats(self):
+        with self._lock:
+            blocks = len(self._blocks)
+        return {
+            'blocks_in_memory': blocks,
+            'upstream_calls': self.upstream_calls,
+            'single_flight': self._flights.stats(),
+            'circuit': self.breaker.snapshot()
+        }
+
+
+weather_client = WeatherClient(
+    weather_cache,
+    forecast_days=Config.WEATHER_FORECAST_DAYS,
+    breaker=CircuitBreaker(
+        "open-meteo",
+        failure_threshold=Config.CIRCUIT_FAILURE_THRESHOLD,
+        window_seconds=Config.CIRCUIT_WINDOW_SECONDS,
+        open_seconds=Config.CIRCUIT_OPEN_SECONDS,
+        slow_call_seconds=Config.CIRCUIT_SLOW_CALL_SECONDS
+    )
+)
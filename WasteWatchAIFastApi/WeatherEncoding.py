@@ -0,0 +1,136 @@
+"""Shared weather encoding for training, prediction and correlation.
+
+Open-Meteo WMO weather codes (0-99) are translated with precomputed lookup
+tables, so encoding a whole series is a single array index. Every code and
+description maps to the same `weer_numeriek` value in training and serving.
+"""
+import numpy as np
+import pandas as pd
+
+# Numeric weather feature used by the prediction models (weer_numeriek)
+WEATHER_FEATURES = {
+    'Zonnig': 0, 'Gedeeltelijk bewolkt': 1, 'Bewolkt': 2,
+    'Regenachtig': 3, 'Onweer': 4, 'Sneeuw': 5, 'Mistig': 6, 'Onbekend': 1
+}
+UNKNOWN_FEATURE = WEATHER_FEATURES['Onbekend']
+
+# Detailed Dutch descriptions per WMO code, with the training category they belong to
+CODE_DESCRIPTIONS = {
+    0: ('Zonnig', 'Zonnig'),
+    1: ('Gedeeltelijk bewolkt', 'Gedeeltelijk bewolkt'),
+    2: ('Gedeeltelijk bewolkt', 'Gedeeltelijk bewolkt'),
+    3: ('Bewolkt', 'Bewolkt'),
+    45: ('Mistig', 'Mistig'),
+    48: ('Mistig', 'Mistig'),
+    51: ('Lichte motregen', 'Regenachtig'),
+    53: ('Motregen', 'Regenachtig'),
+    55: ('Motregen', 'Regenachtig'),
+    56: ('IJzel', 'Regenachtig'),
+    57: ('IJzel', 'Regenachtig'),
+    61: ('Lichte regen', 'Regenachtig'),
+    63: ('Regen', 'Regenachtig'),
+    65: ('Zware regen', 'Regenachtig'),
+    66: ('IJzel', 'Regenachtig'),
+    67: ('IJzel', 'Regenachtig'),
+    71: ('Lichte sneeuw', 'Sneeuw'),
+    73: ('Sneeuw', 'Sneeuw'),
+    75: ('Zware sneeuw', 'Sneeuw'),
+    77: ('Hagel', 'Sneeuw'),
+    80: ('Lichte buien', 'Regenachtig'),
+    81: ('Buien', 'Regenachtig'),
+    82: ('Zware buien', 'Regenachtig'),
+    85: ('Sneeuwbuien', 'Sneeuw'),
+    86: ('Sneeuwbuien', 'Sneeuw'),
+    95: ('Onweer', 'Onweer'),
+    96: ('Onweer met hagel', 'Onweer'),
+    99: ('Zwaar onweer', 'Onweer')
+}
+DEFAULT_DESCRIPTION = 'Bewolkt'
+
+# Descriptions stored by the backend WeatherController
+BACKEND_DESCRIPTIONS = {
+    'Helder': 'Zonnig',
+    'Mist': 'Mistig'
+}
+
+# Every known description -> numeric feature
+DESCRIPTION_FEATURES = dict(WEATHER_FEATURES)
+DESCRIPTION_FEATURES.update({description: WEATHER_FEATURES[category]
+                             for description, category in CODE_DESCRIPTIONS.values()})
+DESCRIPTION_FEATURES.update({description: WEATHER_FEATURES[category]
+                             for description, category in BACKEND_DESCRIPTIONS.items()})
+
+# Coarser categories shown in the correlation analysis
+CORRELATION_CATEGORIES = ['Onbekend', 'Zonnig', 'Gedeeltelijk bewolkt', 'Mistig',
+                          'Motregen', 'Regenachtig', 'Sneeuw', 'Onweer']
+_CORRELATION_CODES = {
+    'Zonnig': [0],
+    'Gedeeltelijk bewolkt': [1, 2, 3],
+    'Mistig': [45, 48],
+    'Motregen': [51, 53, 55, 56, 57],
+    'Regenachtig': [61, 63, 65, 66, 67, 80, 81, 82],
+    'Sneeuw': [71, 73, 75, 77, 85, 86],
+    'Onweer': [95, 96, 99]
+}
+
+# Lookup tables: index 0-99 is the WMO code, the extra last slot is for missing/invalid codes
+_UNKNOWN_CODE = 100
+
+
+def _build_tables():
+    descriptions = np.full(_UNKNOWN_CODE + 1, DEFAULT_DESCRIPTION, dtype=object)
+    for code, (description, _) in CODE_DESCRIPTIONS.items():
+        descriptions[code] = description
+
+    features = np.array([DESCRIPTION_FEATURES[description] for description in descriptions], dtype=np.int64)
+
+    categories = np.zeros(_UNKNOWN_CODE + 1, dtype=np.int64)
+    for category, codes in _CORRELATION_CODES.items():
+        categories[codes] = CORRELATION_CATEGORIES.index(category)
+
+    descriptions.flags.writeable = False
+    features.flags.writeable = False
+    categories.flags.writeable = False
+    return descriptions, features, categories
+
+
+DESCRIPTION_LUT, FEATURE_LUT, CATEGORY_LUT = _build_tables()
+_CATEGORY_NAMES = np.array(CORRELATION_CATEGORIES, dtype=object)
+
+
+def code_index(codes):
+    """Turn weather codes (list, array or Series; None/NaN allowed) into lookup table indices"""
+    values = pd.to_numeric(pd.Series(np.asarray(codes, dtype=object).ravel()), errors='coerce').to_numpy(dtype=np.float64)
+    valid = np.isfinite(values) & (values >= 0) & (values < _UNKNOWN_CODE)
+    index = np.full(values.shape, _UNKNOWN_CODE, dtype=np.int64)
+    index[valid] = values[valid].astype(np.int64)
+    return index
+
+
+def describe_codes(codes):
+    """Dutch weather descriptions for an array of weather codes"""
+    return DESCRIPTION_LUT[code_index(codes)]
+
+
+def encode_codes(codes):
+    """Numeric weather feature (weer_numeriek) for an array of weather codes"""
+    return FEATURE_LUT[code_index(codes)]
+
+
+def categorize_codes(codes):
+    """Correlation weather categories for an array of weather codes"""
+    return _CATEGORY_NAMES[CATEGORY_LUT[code_index(codes)]]
+
+
+def encode_descriptions(descriptions):
+    """Numeric weather feature for a Series of Dutch descriptions; unknown descriptions become 'Onbekend'"""
+    series = pd.Series(descriptions)
+    return series.map(DESCRIPTION_FEATURES).fillna(UNKNOWN_FEATURE).astype(np.int64)
+
+
+def describe_code(code):
+    return describe_codes([code])[0]
+
+
+def encode_description(description):
+    return DESCRIPTION_FEATURES.get(description, UNKNOWN_FEATURE)
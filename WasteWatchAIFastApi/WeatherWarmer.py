@@ -0,0 +1,40 @@
+import asyncio
+from typing import List, Tuple
+
+import Config
+from WeatherCache import snap_coordinates
+
+
+def unique_cells(hotspots: List[Tuple[str, float, float]]):
+    """Hotspots that snap to the same weather grid cell only need one fetch"""
+    cells = {}
+    for name, latitude, longitude in hotspots:
+        cells.setdefault(snap_coordinates(latitude, longitude), []).append(name)
+    return cells
+
+
+async def warm_once(client, hotspots: List[Tuple[str, float, float]]):
+    """Pre-fetch the forecast horizon for every hotspot cell into the weather cache"""
+    warmed = 0
+    for (latitude, longitude), names in unique_cells(hotspots).items():
+        try:
+            days = await client.prefetch_forecast(latitude, longitude)
+            warmed += 1
+            print(f"🔥 Weather warmed for {', '.join(names)}: {days} forecast days")
+        except Exception as e:
+            print(f"⚠️  Weather warmer failed for {', '.join(names)}: {e}")
+    return warmed
+
+
+async def run_warmer(client, hotspots: List[Tuple[str, float, float]] = None,
+                     interval: float = Config.WEATHER_WARMER_INTERVAL_SECONDS):
+    """Background task started from the lifespan hook; refreshes before the forecast TTL runs out"""
+    hotspots = hotspots if hotspots is not None else Config.WEATHER_HOTSPOTS
+    if not hotspots:
+        print("🔥 No weather hotspots configured, warmer disabled")
+        return
+
+    print(f"🔥 Weather warmer started for {len(hotspots)} hotspots every {interval:.0f}s")
+    while True:
+        await warm_once(client, hotspots)
+        await asyncio.sleep(interval)
@@ -11,9 +11,51 @@ from pydantic import BaseModel
 from typing import List
 import json
 from contextlib import asynccontextmanager
-from PredictionModelDummy import router as predictionDummy_router
-from PredictionModel import router as prediction_router
+import asyncio
+import secrets
+from PredictionModelDummy import router as predictionDummy_router, startup_models_dummy
+from PredictionModelDummy import drift_source as dummy_drift_source, tune_models as tune_dummy_models
+from PredictionModelDummy import prediction_cache as dummy_prediction_cache
+from PredictionModel import router as prediction_router, startup_models
+from PredictionModel import drift_source as trash_drift_source, tune_models as tune_trash_models
+from PredictionModel import prediction_cache as trash_prediction_cache
 from CorrelationModel import router as correlation_router
+import HttpClient
+import Config
+from WeatherClient import weather_client
+from WeatherCache import weather_cache
+from WeatherWarmer import run_warmer
+from TrainingWorker import run_training_worker, readiness, reload_models
+from DriftMonitor import run_retrain_scheduler, decisions as retrain_decisions
+from HyperparameterSearch import load_results, select_params
+from SingleFlight import SingleFlight
+from fastapi.responses import JSONResponse
+from fastapi import Header
+from typing import Optional
+
+# Loaders per model set, used at startup and by the admin reload endpoint
+MODEL_LOADERS = {
+    "dummy": startup_models_dummy,
+    "trash": startup_models
+}
+reload_tasks = set()
+# Hyperparameter search per model set; repeated requests join the running search
+MODEL_TUNERS = {
+    "dummy": tune_dummy_models,
+    "trash": tune_trash_models
+}
+tuning_flights = SingleFlight("tuning")
+# Single prediction result caches per model set
+PREDICTION_CACHES = {
+    "dummy": dummy_prediction_cache,
+    "trash": trash_prediction_cache
+}
+# Model sets checked for drift by the retrain scheduler
+DRIFT_SOURCES = [dummy_drift_source, trash_drift_source]
+
+
+def retrain(name: str):
+    return reload_models(name, MODEL_LOADERS[name])
 
 
 @asynccontextmanager
@@ -21,22 +63,31 @@ async def lifespan(app: FastAPI):
     # Startup
     print("🚀 Starting WasteWatch AI FastAPI...")
     
-    # Import here to avoid circular imports
-    from PredictionModelDummy import startup_models_dummy
-    from PredictionModel import startup_models
-    # Try to initialize models with fallback
-    try:
-        print("📊 Initializing prediction models...")
-        startup_models_dummy()
-        startup_models()
-        print("✅ Models initialized successfully!")
-    except Exception as e:
-        print(f"⚠️  Model initialization failed, but server will continue: {e}")
+    # Shared HTTP client for Open-Meteo and backend calls
+    await HttpClient.startup()
+    
+    # Background probe that closes the weather circuit once Open-Meteo recovers,
+    # and the warmer that keeps hotspot forecasts in the weather cache
+    background_tasks = [
+        asyncio.create_task(weather_client.run_probe(Config.CIRCUIT_PROBE_INTERVAL_SECONDS)),
+        asyncio.create_task(run_warmer(weather_client))
+    ]
+    
+    # Train (or warm start) the models in the background so the server accepts
+    # connections right away; prediction routes answer 503 until /ready reports ready
+    print("📊 Initializing prediction models in the background...")
+    background_tasks.append(asyncio.create_task(run_training_worker(list(MODEL_LOADERS.items()))))
+    
+    # Periodic drift check on newly ingested data; retrains only when drift or growth crosses a threshold
+    background_tasks.append(asyncio.create_task(run_retrain_scheduler(DRIFT_SOURCES, retrain)))
     
     yield
     
     # Shutdown
     print("🛑 Shutting down WasteWatch AI FastAPI...")
+    for task in background_tasks:
+        task.cancel()
+    await HttpClient.shutdown()
 
 app = FastAPI(lifespan=lifespan)
 
@@ -59,7 +110,76 @@ def read_root():
 
 @app.get("/health")
 def health_check():
-    return {"status": "ok", "timestamp": datetime.now().isoformat()}
+    return {
+        "status": "ok",
+        "timestamp": datetime.now().isoformat(),
+        "weather_circuit": weather_client.breaker.snapshot(),
+        "weather_cache": weather_cache.stats(),
+        "weather_client": weather_client.stats()
+    }
+
+@app.get("/ready")
+def readiness_check():
+    """Readiness per model set; 503 until every model set is loaded"""
+    status = readiness()
+    return JSONResponse(status_code=200 if status["ready"] else 503, content=status)
+
+def check_admin_token(token: Optional[str]):
+    if not Config.ADMIN_TOKEN:
+        raise HTTPException(status_code=403, detail="Admin endpoints are disabled: ADMIN_TOKEN is not configured")
+    if token is None or not secrets.compare_digest(token.encode(), Config.ADMIN_TOKEN.encode()):
+        raise HTTPException(status_code=401, detail="Invalid admin token")
+
+@app.post("/admin/reload", status_code=202)
+async def reload_endpoint(model: str = "all", x_admin_token: Optional[str] = Header(None)):
+    """Load or retrain a model set in the background and swap it in atomically once it is ready"""
+    check_admin_token(x_admin_token)
+    names = list(MODEL_LOADERS) if model == "all" else [model]
+    unknown = [name for name in names if name not in MODEL_LOADERS]
+    if unknown:
+        raise HTTPException(status_code=404, detail=f"Unknown model set: {unknown[0]}")
+    
+    for name in names:
+        task = asyncio.create_task(retrain(name))
+        reload_tasks.add(task)
+        task.add_done_callback(reload_tasks.discard)
+    return {"accepted": names, "status_url": "/ready"}
+
+@app.get("/admin/retraining")
+def retraining_decisions(model: Optional[str] = None, x_admin_token: Optional[str] = Header(None)):
+    """Recent retrain decisions of the drift scheduler with their drift statistics, newest first"""
+    check_admin_token(x_admin_token)
+    recent = [decision for decision in reversed(retrain_decisions) if model is None or decision['model'] == model]
+    return {"interval_seconds": Config.RETRAIN_CHECK_INTERVAL_SECONDS, "decisions": recent}
+
+@app.post("/admin/tune", status_code=202)
+async def tune_endpoint(model: str = "trash", budget_seconds: float = Config.TUNING_BUDGET_SECONDS,
+                        x_admin_token: Optional[str] = Header(None)):
+    """Start a budgeted hyperparameter search in the background; results appear under /admin/tuning"""
+    check_admin_token(x_admin_token)
+    if model not in MODEL_TUNERS:
+        raise HTTPException(status_code=404, detail=f"Unknown model set: {model}")
+    task = asyncio.create_task(tuning_flights.do(model, lambda: MODEL_TUNERS[model](budget_seconds)))
+    reload_tasks.add(task)
+    task.add_done_callback(reload_tasks.discard)
+    return {"accepted": model, "budget_seconds": budget_seconds, "status_url": f"/admin/tuning?model={model}"}
+
+@app.get("/admin/tuning")
+def tuning_results(model: str = "trash", min_r2: Optional[float] = None, x_admin_token: Optional[str] = Header(None)):
+    """Last persisted Pareto front (R² vs inference latency); with min_r2 also the cheapest model meeting it"""
+    check_admin_token(x_admin_token)
+    results = load_results(model)
+    if results is None:
+        raise HTTPException(status_code=404, detail=f"No tuning results for model set: {model}")
+    if min_r2 is not None:
+        results["recommended"] = select_params(results["front"], min_r2)
+    return results
+
+@app.get("/admin/prediction-cache")
+def prediction_cache_stats(x_admin_token: Optional[str] = Header(None)):
+    """Size, hit rate and invalidations of the prediction cache per model set"""
+    check_admin_token(x_admin_token)
+    return {name: cache.stats() for name, cache in PREDICTION_CACHES.items()}
 
 if __name__ == "__main__":
     import uvicorn